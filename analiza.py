@@ -0,0 +1,194 @@
+"""Analiza zapisanih iger. Vse pozicije iz datotek z zapisi iger (ki jih npr. zapiše turnir.py --zapisi)
+oceni algoritem v skupini procesov, ocene doda v datoteko z rezultati (JSON lines) in izpiše napake:
+poteze, s katerimi je igralec zapravil dobljeno igro ali precej poslabšal oceno pozicije.
+Pozicij, ki so v datoteki z rezultati že ocenjene, ne ocenjuje ponovno, zato lahko analizo prekinemo
+in nadaljujemo ter dodajamo nove igre.
+
+Primer: python analiza.py igre.bin --rezultati ocene.jsonl --cas 0.5 --procesi 4 --porocilo napake.jsonl"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import time
+
+from motor import (Algoritem, TranspozicijskaTabela, Resevalec, MizerniResevalec, nalozi_bazo, beri_igre, pozicije_igre,
+                   igra_iz_stanja, MINIMAX, ALFABETA, UTEZ, NAJVECJA_VREDNOST_CRTE, RDECI, MODRI)
+
+IZGUBLJENA_ZMAGA = "izgubljena zmaga" # Igralec je imel dobljeno igro, po potezi pa je izgubljena.
+NAPAKA = "napaka" # Ocena pozicije se je s potezo poslabšala za več kot prag.
+
+def kljuc_pozicije(igra):
+    """Vrne ključ pozicije v datoteki z rezultati. Pozicijo določajo pokrita polja, saj barve domin ne
+    vplivajo na nadaljevanje igre, igralec na potezi pa je določen s številom položenih domin."""
+    return "{0}x{1}{2}:{3:x}".format(igra.vrstice, igra.stolpci, "m" if igra.mizerna else "", igra.rdeca | igra.modra)
+
+# Tabela in rešitelja procesa (za normalno in mizerno igro), ki jih uporabljajo vse pozicije v tem procesu.
+_analiza = {}
+
+def oceni_pozicijo(naloga):
+    """Oceni pozicijo z vidika igralca na potezi. Če je pozicija dovolj majhna, jo točno reši, sicer jo
+    preišče z dano metodo v danem času oz. do dane globine. Vrne slovar, ki ga zapišemo med rezultate."""
+    (kljuc, stanje, metoda, cas, globina) = naloga
+    igra = igra_iz_stanja(stanje)
+    if "tabela" not in _analiza:
+        _analiza["tabela"] = TranspozicijskaTabela()
+    if igra.mizerna not in _analiza:
+        _analiza[igra.mizerna] = MizerniResevalec() if igra.mizerna else Resevalec(nalozi_bazo())
+    resevalec = _analiza[igra.mizerna]
+    zacetek = time.perf_counter()
+    if resevalec.je_resljiva(igra):
+        domina = resevalec.zmagovalna_poteza(igra) # V izgubljeni poziciji je vseeno, katero potezo naredimo.
+        (vrednost, tocno, dosezena_globina) = (UTEZ if domina is not None else -UTEZ, True, None)
+    else:
+        algoritem = Algoritem(igra.kopija_igre(), _analiza["tabela"], resevalec)
+        domina = algoritem.iterativno_poglabljanje(metoda, cas, najvecja_globina=globina)
+        vrednost = algoritem.vrednost
+        (tocno, dosezena_globina) = (vrednost is not None and abs(vrednost) >= UTEZ, algoritem.globina)
+    return {
+        "kljuc": kljuc,
+        "vrednost": vrednost,
+        "tocno": tocno,
+        "poteza": igra.poteza_domine(domina) if domina is not None else None,
+        "metoda": metoda,
+        "globina": dosezena_globina,
+        "cas": time.perf_counter() - zacetek
+    }
+
+def nalozi_rezultate(pot):
+    """Vrne slovar ključ pozicije -> rezultat iz datoteke z rezultati. Nepopolno zadnjo vrstico
+    (če je bila analiza prekinjena med pisanjem) izpusti."""
+    rezultati = {}
+    if os.path.exists(pot):
+        with open(pot) as datoteka:
+            for vrstica in datoteka:
+                try:
+                    rezultat = json.loads(vrstica)
+                except ValueError:
+                    continue
+                rezultati[rezultat["kljuc"]] = rezultat
+    return rezultati
+
+def nove_pozicije(poti, rezultati):
+    """Ponovi vse igre in vrne slovar ključ -> stanje pozicij, ki jih ni med rezultati. Končnih pozicij
+    ne ocenjujemo, saj je njihov izid znan."""
+    pozicije = {}
+    for pot in poti:
+        for (velikost, mizerna, domine) in beri_igre(pot):
+            for igra in pozicije_igre(velikost, mizerna, domine):
+                kljuc = kljuc_pozicije(igra)
+                if kljuc not in rezultati and kljuc not in pozicije and igra.stevilo_potez():
+                    pozicije[kljuc] = (igra.velikost, igra.rdeca, igra.modra, igra.na_potezi, igra.mizerna)
+    return pozicije
+
+def analiziraj(poti, pot_rezultatov, metoda=ALFABETA, cas=0.5, globina=None, procesi=None):
+    """Oceni vse še neocenjene pozicije iz zapisov iger in jih sproti dodaja v datoteko z rezultati.
+    Vrne slovar vseh rezultatov."""
+    rezultati = nalozi_rezultate(pot_rezultatov)
+    pozicije = nove_pozicije(poti, rezultati)
+    print("Novih pozicij: {0}, že ocenjenih: {1}.".format(len(pozicije), len(rezultati)))
+    if not pozicije:
+        return rezultati
+    naloge = [(kljuc, stanje, metoda, cas, globina) for (kljuc, stanje) in pozicije.items()]
+    zacetek = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(procesi) as bazen, open(pot_rezultatov, "a") as datoteka:
+        for (stevec, rezultat) in enumerate(bazen.map(oceni_pozicijo, naloge), 1):
+            datoteka.write(json.dumps(rezultat) + "\n")
+            rezultati[rezultat["kljuc"]] = rezultat
+            if stevec % max(1, len(naloge) // 10) == 0:
+                datoteka.flush()
+                print("Ocenjenih {0}/{1} pozicij ({2:.0f} s).".format(stevec, len(naloge), time.perf_counter() - zacetek))
+    return rezultati
+
+def vrednost_po_potezi(igra, rezultati):
+    """Vrne (vrednost, točno, dosežena globina) pozicije po potezi z vidika igralca, ki je potezo naredil."""
+    if not igra.stevilo_potez(): # Igralec je položil zadnjo domino.
+        return (-UTEZ if igra.mizerna else UTEZ, True, None)
+    rezultat = rezultati.get(kljuc_pozicije(igra))
+    if rezultat is None or rezultat["vrednost"] is None:
+        return (None, False, None)
+    return (-rezultat["vrednost"], rezultat["tocno"], rezultat["globina"])
+
+def porocilo_potez(poti, rezultati, prag=NAJVECJA_VREDNOST_CRTE):
+    """Za vsako potezo vsake igre vrne slovar z vrednostjo pred in po potezi, izgubo glede na najboljšo
+    potezo in vrsto napake (None, IZGUBLJENA_ZMAGA ali NAPAKA). Primerjamo le istovrstni vrednosti: če je
+    vrednost pred potezo točna, potezo presodimo le po točnem izidu po njej, hevristični oceni pa le, če
+    sta izračunani do iste globine. Sicer je izguba None. Poteza, enaka najboljši, ni nikoli napaka."""
+    for pot in poti:
+        for (indeks, (velikost, mizerna, domine)) in enumerate(beri_igre(pot)):
+            pozicije = pozicije_igre(velikost, mizerna, domine)
+            pred = next(pozicije)
+            for (stevilka, (domina, po)) in enumerate(zip(domine, pozicije), 1):
+                rezultat = rezultati.get(kljuc_pozicije(pred), {})
+                (vrednost_pred, tocno_pred) = (rezultat.get("vrednost"), rezultat.get("tocno", False))
+                (vrednost_po, tocno_po, globina_po) = vrednost_po_potezi(po, rezultati)
+                odigrana = pred.poteza_domine(domina)
+                izguba = None
+                napaka = None
+                if rezultat.get("poteza") is not None and list(odigrana) == list(rezultat["poteza"]):
+                    izguba = 0
+                elif vrednost_pred is None or vrednost_po is None:
+                    pass
+                elif tocno_pred:
+                    if tocno_po:
+                        izguba = vrednost_pred - vrednost_po
+                        if vrednost_pred >= UTEZ and vrednost_po <= -UTEZ:
+                            napaka = IZGUBLJENA_ZMAGA
+                elif not tocno_po and globina_po == rezultat.get("globina"):
+                    izguba = vrednost_pred - vrednost_po
+                    if izguba >= prag:
+                        napaka = NAPAKA
+                yield {
+                    "datoteka": pot,
+                    "igra": indeks,
+                    "poteza": stevilka,
+                    "igralec": pred.na_potezi,
+                    "odigrana": odigrana,
+                    "najboljsa": rezultat.get("poteza"),
+                    "vrednost_pred": vrednost_pred,
+                    "vrednost_po": vrednost_po,
+                    "izguba": izguba,
+                    "napaka": napaka
+                }
+                pred = po
+
+def opis_poteze(poteza):
+    return "({0},{1})-({2},{3})".format(*poteza) if poteza is not None else "-"
+
+def izpisi_napake(porocilo, pot_porocila=None):
+    """Izpiše napake iz poročila in število napak vsakega igralca. Če je podana pot, vanjo zapiše
+    poročilo o vseh potezah (JSON lines)."""
+    napake = {RDECI: {IZGUBLJENA_ZMAGA: 0, NAPAKA: 0}, MODRI: {IZGUBLJENA_ZMAGA: 0, NAPAKA: 0}}
+    poteze = 0
+    datoteka = open(pot_porocila, "w") if pot_porocila is not None else None
+    try:
+        for vrstica in porocilo:
+            poteze += 1
+            if datoteka is not None:
+                datoteka.write(json.dumps(vrstica) + "\n")
+            if vrstica["napaka"] is not None:
+                napake[vrstica["igralec"]][vrstica["napaka"]] += 1
+                print("{0} igra {1}, poteza {2} ({3}): {4}, najboljša {5}, vrednost {6} -> {7}: {8}".format(
+                    vrstica["datoteka"], vrstica["igra"], vrstica["poteza"], vrstica["igralec"], opis_poteze(vrstica["odigrana"]),
+                    opis_poteze(vrstica["najboljsa"]), vrstica["vrednost_pred"], vrstica["vrednost_po"], vrstica["napaka"]))
+    finally:
+        if datoteka is not None:
+            datoteka.close()
+    print("Pregledanih potez: {0}.".format(poteze))
+    for (igralec, stevilo) in napake.items():
+        print("{0}: {1} izgubljenih zmag, {2} napak".format(igralec, stevilo[IZGUBLJENA_ZMAGA], stevilo[NAPAKA]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analiza zapisanih iger Cram.")
+    parser.add_argument("zapisi", nargs="+", help="datoteke z zapisi iger")
+    parser.add_argument("--rezultati", default="ocene.jsonl", help="datoteka z ocenami pozicij (JSON lines), ki jo analiza dopolnjuje")
+    parser.add_argument("--metoda", default=ALFABETA, choices=(MINIMAX, ALFABETA), help="metoda iskanja za pozicije, ki jih ne moremo rešiti točno")
+    parser.add_argument("--cas", type=float, default=0.5, help="čas za oceno ene pozicije v sekundah")
+    parser.add_argument("--globina", type=int, help="namesto časa omeji globino iskanja")
+    parser.add_argument("--procesi", type=int, default=os.cpu_count(), help="število procesov")
+    parser.add_argument("--prag", type=int, default=NAJVECJA_VREDNOST_CRTE, help="poslabšanje ocene, ki šteje za napako")
+    parser.add_argument("--porocilo", help="datoteka, v katero zapišemo poročilo o vseh potezah (JSON lines)")
+    argumenti = parser.parse_args()
+    cas = float("inf") if argumenti.globina is not None else argumenti.cas
+    rezultati = analiziraj(argumenti.zapisi, argumenti.rezultati, argumenti.metoda, cas, argumenti.globina, argumenti.procesi)
+    izpisi_napake(porocilo_potez(argumenti.zapisi, rezultati, argumenti.prag), argumenti.porocilo)
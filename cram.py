@@ -1,127 +1,130 @@
 import tkinter
 import threading
-import time
-import argparse 
+import queue
+import argparse
+import os
 
-######################################################################
-## Igra
-
-RDECI = "rdeci"
-MODRI = "modri"
-NEPOKRITO = "belo"
-KONEC = "konec"
-NI_KONEC = "ni konec"
-
-def nasprotnik(igralec):
-    if igralec == RDECI:
-        return MODRI
-    elif igralec == MODRI:
-        return RDECI
-    else:
-        assert False, "nasprotnik: prepovedan nasprotnik"
-
-class Igra():
-    def __init__(self, velikost):
-        self.velikost = velikost
-        self.plosca = []
-        for i in range(self.velikost):
-            self.plosca.append([NEPOKRITO for j in range(self.velikost)])
-        self.na_potezi = RDECI
-        self.zgodovina = []
-
-    def kopija_igre(self):
-        """Vrne kopijo te igre."""
-        k = Igra(self.velikost)
-        k.plosca = [self.plosca[i][:] for i in range(self.velikost)]
-        k.na_potezi = self.na_potezi
-        k.zgodovina = self.zgodovina
-        return k
-
-    def zgodovina_igre(self):
-        """Shrani trenutno stanje igre."""
-        plosca_prej = [self.plosca[i][:] for i in range(self.velikost)]
-        na_potezi_prej = self.na_potezi
-        self.zgodovina = (plosca_prej, na_potezi_prej)
- 
-    def veljavne_poteze(self):
-        """Vrne seznam veljavnih potez."""
-        veljavne = []
-        for i in range(self.velikost):
-            for j in range(self.velikost):
-                if self.plosca[i][j] == NEPOKRITO:
-                    if i+1 < self.velikost and self.plosca[i+1][j] == NEPOKRITO:
-                        veljavne.append((i,j,i+1,j))
-                        veljavne.append((i+1,j,i,j))
-                    if j+1 < self.velikost and self.plosca[i][j+1] == NEPOKRITO:
-                        veljavne.append((i,j,i,j+1))
-                        veljavne.append((i,j+1,i,j))
-                elif self.plosca[i][j] != NEPOKRITO and self.plosca[i][j] != RDECI and self.plosca[i][j] != MODRI:
-                    assert False, "igra: neveljavna poteza"
-        return veljavne
-
-    def naredi_potezo(self, x1, y1, x2, y2):
-        """Preveri, če je poteza veljavna. Vrne kdo je naredil potezo in stanje po potezi oz. None, če je neveljavna."""
-        poteza = (x1, y1, x2, y2)
-        veljavne = self.veljavne_poteze()
-        for i in range(len(veljavne)):
-            # Primerja povlečene poteze z veljavnimi.
-            if veljavne[i] == poteza:
-                self.zgodovina_igre()
-                self.plosca[x1][y1] = self.na_potezi
-                self.plosca[x2][y2] = self.na_potezi
-                igralec = self.na_potezi
-                stanje = self.stanje_igre()
-                if stanje == NI_KONEC:
-                    self.na_potezi = nasprotnik(self.na_potezi) # Igre ni konec.
-                return (igralec, stanje)
-        return (self.na_potezi, None) # Poteza ni veljavna.
-
-    def stanje_igre(self):
-        """Preveri stanje igre. Če igre ni konec vrne NI_KONEC dugače KONEC."""
-        stanje = KONEC
-        for i in range(self.velikost):
-            for j in range(self.velikost):
-                if self.plosca[i][j] == NEPOKRITO:
-                    if i+1 < self.velikost and self.plosca[i+1][j] == NEPOKRITO:
-                        stanje = NI_KONEC # Igre ni konec.
-                    if j+1 < self.velikost and self.plosca[i][j+1] == NEPOKRITO:
-                        stanje = NI_KONEC # Igre ni konec.
-                elif self.plosca[i][j] != NEPOKRITO and self.plosca[i][j] != RDECI and self.plosca[i][j] != MODRI:
-                    assert False, "igra: prepovedana poteza"
-        return stanje
+from motor import (Igra, RDECI, MODRI, NI_KONEC, Algoritem, TranspozicijskaTabela, DrevoMCTS, Resevalec, MizerniResevalec, nalozi_bazo,
+                   vzporedni_iskalec, zapri_iskalce, DnevnikIskanja, PisecIger, LAHKO, SREDNJE, TEZKO, POPOLNO, MONTE_CARLO)
 
-    
 ######################################################################
 ## Igralec racunalnik
 
+# Vrste sporočil, ki jih vlakno računalnika pošilja uporabniškemu vmesniku.
+NAPREDEK = "napredek"
+POTEZA = "poteza"
+
 class Racunalnik():
     def __init__(self, gui):
         self.gui = gui
         self.algoritem = None
         self.vlakno = None
+        self.konec_vlakna = None # Dogodek, ki ga nazadnje zagnano vlakno prižge, ko neha uporabljati skupne strukture.
+        self.tabela = TranspozicijskaTabela() # Ostane med potezami, da se znanje ne izgubi.
+        self.drevo = DrevoMCTS() # Tudi drevo Monte Carlo ostane med potezami.
+        if gui.mizerna.get():
+            self.resevalec = MizerniResevalec()
+        else:
+            self.resevalec = Resevalec(nalozi_bazo())
+        self.napoved = None # Najverjetnejša poteza nasprotnika po naši zadnji potezi (maska domine) ali None.
+        self.premisljuje = False # Ali algoritem išče med potezo nasprotnika?
+        self.premisljena_pozicija = None # Pozicija (rdeca, modra, na_potezi), o kateri premišlja.
+        self.zadrzana_poteza = None # Poteza, ki jo je algoritem našel, preden je nasprotnik odigral.
 
     def igraj(self):
-        """Ustvari vlakno in kliče funkcijo preveri()"""
-        self.algoritem = Algoritem(self.gui.igra.kopija_igre())
-        self.vlakno = threading.Thread(target=lambda: self.algoritem.izracunaj_potezo(self.gui.tezavnost))
+        """Če je računalnik premišljeval o pravi poziciji, nadaljuje to iskanje, sicer začne novo."""
+        igra = self.gui.igra
+        if self.premisljuje:
+            if self.premisljena_pozicija == (igra.rdeca, igra.modra, igra.na_potezi):
+                # Nasprotnik je odigral napovedano potezo. Čas težavnosti teče od začetka premišljevanja.
+                self.premisljuje = False
+                self.algoritem.premisljuje = False
+                if self.zadrzana_poteza is not None:
+                    self.sprejmi(self.algoritem, POTEZA, self.zadrzana_poteza)
+                return
+            self.prekini() # Napoved je bila napačna, ostane le znanje v tabeli.
+        self.zacni_iskanje(igra.kopija_igre())
+
+    def cakaj(self):
+        """Na potezi je nasprotnik. Če je to človek, računalnik medtem išče potezo za pozicijo po njegovi
+        najverjetnejši potezi."""
+        napoved = self.napoved
+        self.napoved = None
+        if napoved is None or self.gui.nacin != 1 or not self.gui.premisljevanje.get():
+            return
+        igra = self.gui.igra.kopija_igre()
+        igra.odigraj(napoved)
+        if igra.stanje_igre() != NI_KONEC:
+            return
+        self.premisljena_pozicija = (igra.rdeca, igra.modra, igra.na_potezi)
+        self.zadrzana_poteza = None
+        self.zacni_iskanje(igra, premisljevanje=True)
+
+    def zacni_iskanje(self, igra, premisljevanje=False):
+        """Ustvari vlakno, v katerem algoritem išče potezo. Vlakno napredek in potezo sporoča uporabniškemu
+        vmesniku prek vrste sporočil, zato ga ni treba periodično preverjati. Tabelo, rešitelja in drevo si
+        deli s prejšnjim vlaknom, zato začne iskati šele, ko se prejšnje (prekinjeno) vlakno konča."""
+        iskalec = vzporedni_iskalec(self.gui.procesi)
+        algoritem = Algoritem(igra, self.tabela, self.resevalec, iskalec, self.drevo)
+        algoritem.premisljuje = premisljevanje
+        algoritem.opazovalci.append(lambda statistika: self.gui.sporoci(self, algoritem, NAPREDEK, statistika))
+        if self.gui.dnevnik is not None:
+            algoritem.opazovalci.append(DnevnikIskanja(self.gui.dnevnik))
+        self.algoritem = algoritem
+        self.premisljuje = premisljevanje
+        prejsnje = self.konec_vlakna
+        self.konec_vlakna = threading.Event()
+        self.vlakno = threading.Thread(target=self.razmisljaj, args=(algoritem, self.gui.tezavnost, prejsnje, self.konec_vlakna),
+                                       daemon=True)
         self.vlakno.start()
-        self.preveri()
 
-    def preveri(self):
-        """Preveri, če je igralec naredil potezo in jo zapiše"""
-        if self.algoritem.poteza: # Algoritem je našel potezo.
-            (x1, y1, x2, y2) = self.algoritem.poteza
-            self.gui.naredi_potezo(x1, y1, x2, y2)
+    def razmisljaj(self, algoritem, tezavnost, prejsnje, konec):
+        """Teče v vlaknu: počaka, da se prejšnje vlakno konča, izračuna potezo in jo sporoči uporabniškemu
+        vmesniku. Na prejšnje vlakno ne čakamo v glavnem vlaknu, ker prejšnje vlakno morda ravno sporoča
+        napredek in čaka nanj."""
+        if prejsnje is not None:
+            prejsnje.wait()
+        try:
+            algoritem.izracunaj_potezo(tezavnost)
+        finally:
+            konec.set()
+        self.gui.sporoci(self, algoritem, POTEZA, algoritem.poteza)
+
+    def sprejmi(self, algoritem, vrsta, podatki):
+        """Obdela sporočilo vlakna. Kliče se v glavnem vlaknu, zato lahko spreminja ploščo. Sporočila
+        algoritmov, ki smo jih prekinili, zavrže, potezo premišljevanja pa zadrži do nasprotnikove poteze."""
+        if algoritem is not self.algoritem:
+            return
+        if vrsta == NAPREDEK:
+            if not self.premisljuje:
+                self.gui.napis.set("Računalnik razmišlja: globina {0}, {1} vozlišč ({2:.0f}/s), {3:.1f} s".format(
+                    podatki["globina"], podatki["vozlisca"], podatki["vozlisca/s"], podatki["cas"]))
+        elif vrsta == POTEZA:
+            if self.premisljuje:
+                self.zadrzana_poteza = podatki
+                return
+            self.algoritem = None
             self.vlakno = None
-        else: # Algoritem ni našel poteze.
-            self.gui.plosca.after(400, self.preveri)
+            # Drugi korak glavne variante je najverjetnejši odgovor nasprotnika.
+            varianta = algoritem.prejsnja_varianta
+            if len(varianta) >= 2 and algoritem.igra.poteza_domine(varianta[0]) == podatki:
+                self.napoved = varianta[1]
+            else:
+                self.napoved = None
+            (x1, y1, x2, y2) = podatki
+            self.gui.naredi_potezo(x1, y1, x2, y2)
 
     def prekini(self):
-        """Prekine razmišljanje algoritma."""
-        if self.vlakno:
+        """Prekine razmišljanje ali premišljevanje algoritma. Na vlakno ne čaka: algoritem prekinitev opazi
+        v največ 1024 vozliščih (rešitelj pri naslednji novi poziciji) in se konča sam, njegova sporočila pa
+        sprejmi() zavrže. Naslednje iskanje počaka nanj, preden začne uporabljati skupne strukture."""
+        if self.algoritem is not None:
             self.algoritem.prekini = True
-            self.vlakno.join()
+            self.algoritem = None
             self.vlakno = None
+        self.premisljuje = False
+        self.zadrzana_poteza = None
+        self.napoved = None
 
     def klik(self, pozicija1):
         # Računalnik ignorira klike.
@@ -131,193 +134,6 @@ class Racunalnik():
         # Računalnik ignorira spuste.
         pass
     
-######################################################################
-## Algoritem
-
-UTEZ = 1000000000
-NESKONCNO = UTEZ + 1
-
-class Algoritem():
-
-    def __init__(self, igra):
-        self.igra = igra
-        self.poteza = None # Sem zapišemo potezo.
-        self.prekini = False # Je igra prekinjena?
-
-    def izracunaj_potezo(self, globina):
-        """Izračuna najboljšo potezo za trenutno stanje igre po izbrani metodi."""
-        self.poteza = None
-        # Določimo metodo.
-        if globina == 2: # Metoda je minimax.
-            self.poteza = self.minimax(globina, True)[0]
-        elif globina == 3: # Metoda je alfa-beta.
-            self.poteza = self.alfabeta(globina, -NESKONCNO, NESKONCNO, True)[0]
-        else:
-            assert False, "algoritem: prepovedana metoda"
-
-    def vrednost_igre(self):
-        """Sešteje vrednosti vseh vrstic/stolpcev na plošči in vrne seštevek."""
-        # Slovar, ki pove, koliko so vredne posamezne vrstice oz. stolpci, kjer je "x : y":
-        # x je število nezasedenih polj v vrstici oz. stolpcu in y vrednost vrstice oz. stolpca.
-        if self.igra.velikost == 5: # Če je igralno polje velikosti 5x5.
-            vrednosti_vrstic_stolpcev = {
-                0 : UTEZ//100,
-                2 : UTEZ//10000,
-                4 : UTEZ//1000000,
-                5 : -UTEZ//1000000,
-                3 : -UTEZ//10000,
-                1 : -UTEZ//100
-            }
-        elif self.igra.velikost == 6: # Če je igralno polje velikosti 6x6.
-            vrednosti_vrstic_stolpcev = {
-                0 : UTEZ//100,
-                2 : UTEZ//10000,
-                4 : UTEZ//1000000,
-                6 : 0,
-                5 : -UTEZ//1000000,
-                3 : -UTEZ//10000,
-                1 : -UTEZ//100
-            }
-        elif self.igra.velikost == 7: # Če je igralno polje velikosti 7x7.
-            vrednosti_vrstic_stolpcev = {
-                0 : UTEZ//100,
-                2 : UTEZ//10000,
-                4 : UTEZ//1000000,
-                6 : UTEZ//100000000,
-                7 : -UTEZ//100000000,
-                5 : -UTEZ//1000000,
-                3 : -UTEZ//10000,
-                1 : -UTEZ//100
-            }   
-        vrednost = 0
-        p1 = 0
-        p2 = 0
-        for i in range(self.igra.velikost):
-            for j in range(self.igra.velikost):
-                if self.igra.plosca[i][j] == NEPOKRITO:
-                    p1 += 1
-                if self.igra.plosca[j][i] == NEPOKRITO:
-                    p2 += 1        
-            vrednost = vrednost + vrednosti_vrstic_stolpcev.get(p1,0) + vrednosti_vrstic_stolpcev.get(p2,0)
-        return vrednost
-
-##############################################
-## Minimax
-
-    def minimax(self, globina, maksimiziramo):
-        """Metoda minimax. Vrne potezo in njeno vrednost."""
-        stanje_minimax = self.igra.stanje_igre()
-        igralec_minimax = self.igra.na_potezi
-        # Igre je konec.
-        if stanje_minimax == KONEC: 
-            if igralec_minimax == MODRI:
-                return (None, UTEZ)
-            elif igralec_minimax == RDECI:
-                return (None, -UTEZ)
-        # Igre ni konec.
-        elif stanje_minimax == NI_KONEC: 
-            if globina == 0: # Zmanjkalo je globine.
-                return (None, self.vrednost_igre())
-            else:
-                globina -=1
-                if maksimiziramo:  # Maksimiziramo
-                    naj_poteza = None
-                    naj_vrednost = -NESKONCNO
-                    veljavne = self.igra.veljavne_poteze()
-                    for p in range(len(veljavne)):
-                        (x1, y1, x2, y2) = veljavne[p]
-                        stanje_max = self.igra.naredi_potezo(x1, y1, x2, y2)[1]
-                        zgodovina_max = self.igra.zgodovina
-                        vrednost = self.minimax(globina, not maksimiziramo)[1]
-                        (self.igra.plosca, self.igra.na_potezi) = zgodovina_max  
-                        if vrednost > naj_vrednost:
-                            naj_vrednost = vrednost
-                            naj_poteza = veljavne[p]
-                        if self.prekini is True: # Igro prekinemo.
-                            break
-                        
-                else: # Minimiziramo
-                    naj_poteza = None
-                    naj_vrednost = NESKONCNO
-                    veljavne = self.igra.veljavne_poteze()
-                    for p in range(len(veljavne)):
-                        (x1, y1, x2, y2) = veljavne[p]
-                        stanje_mini = self.igra.naredi_potezo(x1, y1, x2, y2)[1]
-                        zgodovina_mini = self.igra.zgodovina
-                        vrednost = self.minimax(globina, not maksimiziramo)[1]
-                        (self.igra.plosca, self.igra.na_potezi) = zgodovina_mini
-                        if vrednost <= naj_vrednost:
-                            naj_vrednost = vrednost
-                            naj_poteza = veljavne[p]
-                        if self.prekini is True: # Igro prekinemo.
-                            break
-
-                assert (naj_poteza is not None), "minimax: izračunana poteza je None"                               
-                return (naj_poteza, naj_vrednost)
-        else:
-            assert False, "minimax: prepovedano stanje igre"
-
-###########################################################
-## Alfabeta
-
-    def alfabeta(self, globina, alfa, beta, maksimiziramo):
-        """Metoda minimax. Vrne potezo in njeno vrednost."""
-        stanje_alfabeta = self.igra.stanje_igre()
-        igralec_alfabeta = self.igra.na_potezi
-        # Igre je konec.
-        if stanje_alfabeta == KONEC: 
-            if igralec_alfabeta == MODRI:
-                return (None, UTEZ)
-            elif igralec_alfabeta == RDECI:
-                return (None, -UTEZ)
-        # Igre ni konec.
-        elif stanje_alfabeta == NI_KONEC: 
-            if globina == 0: # Zmanjkalo je globine.
-                return (None, self.vrednost_igre())
-            else:
-                globina -=1
-                if maksimiziramo:  # Maksimiziramo
-                    naj_poteza = None
-                    veljavne = self.igra.veljavne_poteze()
-                    if len(veljavne) > 70: # Zmanjšamo globino.
-                        globina -=1
-                    for p in range(len(veljavne)):
-                        (x1, y1, x2, y2) = veljavne[p]
-                        stanje_max = self.igra.naredi_potezo(x1, y1, x2, y2)[1]
-                        zgodovina_max = self.igra.zgodovina
-                        vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
-                        (self.igra.plosca, self.igra.na_potezi) = zgodovina_max  
-                        if vrednost > alfa:
-                            alfa = vrednost
-                            naj_poteza = veljavne[p]
-                        if alfa >= beta:
-                            break
-                        if self.prekini is True: # Igro prekinemo.
-                            break
-                    return (naj_poteza, alfa)
-                        
-                else: # Minimiziramo
-                    naj_poteza = None
-                    veljavne = self.igra.veljavne_poteze()
-                    for p in range(len(veljavne)):
-                        (x1, y1, x2, y2) = veljavne[p]
-                        stanje_mini = self.igra.naredi_potezo(x1, y1, x2, y2)[1]
-                        zgodovina_mini = self.igra.zgodovina
-                        vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
-                        (self.igra.plosca, self.igra.na_potezi) = zgodovina_mini
-                        if vrednost < beta:
-                            beta = vrednost
-                            naj_poteza = veljavne[p]
-                        if alfa >= beta:
-                            break
-                        if self.prekini is True: # Igro prekinemo.
-                            break
-                    return (naj_poteza, beta)
-                        
-        else:
-            assert False, "alfabeta: prepovedano stanje igre"
-        
-            
 ######################################################################
 ## Igralec človek
 
@@ -335,6 +151,10 @@ class Clovek():
             self.gui.naredi_potezo(self.pozicija1[0], self.pozicija1[1], pozicija2[0], pozicija2[1])
             self.pozicija1 = None
 
+    def cakaj(self):
+        # Človek med potezo nasprotnika ne premišljuje.
+        pass
+
     def prekini(self):
         # Človek igorira prekinitev razmišljanja.
         pass
@@ -349,19 +169,36 @@ class Clovek():
 ######################################################################
 #GUI
 
-ENOTA = 75
-POKRITO="rdeco/modro"
+NAJVECJA_ENOTA = 75 # Največja velikost polja v pikslih.
+NAJVECJA_PLOSCA = 660 # Polja na velikih ploščah zmanjšamo, da plošča ni večja od tega.
+BARVA_PLOSCE = "AntiqueWhite1"
+BARVE = {RDECI: "red", MODRI: "blue"}
+# Velikosti (vrstice, stolpci) v meniju.
+KVADRATNE_VELIKOSTI = [(n, n) for n in range(5, 13)]
+PRAVOKOTNE_VELIKOSTI = [(4, 6), (5, 7), (6, 8), (6, 9), (8, 10), (10, 12)]
         
 class Gui():
 
-    def __init__(self, master):
+    def __init__(self, master, procesi=1, dnevnik=None, mizerna=False, zapisi=None):
         self.igra = None
         self.plosca = None
         self.rdeci = None # Rdeči igralec
         self.modri = None # Modri igralec
         self.nacin = 1
-        self.velikost = 5
-        self.tezavnost = 3
+        self.velikost = (5, 5) # (vrstice, stolpci)
+        self.enota = NAJVECJA_ENOTA # Velikost polja v pikslih.
+        self.polja = [] # Pravokotniki polj na platnu, za vsako vrstico seznam.
+        self.tezavnost = TEZKO
+        self.procesi = procesi # Število procesov za iskanje računalnika.
+        self.dnevnik = dnevnik # Datoteka, v katero računalnik zapisuje statistiko iskanja, ali None.
+        self.zapisi = zapisi # Datoteka, v katero dodajamo zapise končanih iger, ali None.
+        self.master = master
+        self.premisljevanje = tkinter.BooleanVar(master, value=True) # Ali računalnik išče med potezo človeka?
+        self.mizerna = tkinter.BooleanVar(master, value=mizerna) # Ali igramo mizerno različico?
+        self.sporocila = queue.Queue() # Sporočila vlaken računalnikov: (igralec, algoritem, vrsta, podatki).
+
+        # Vlakna računalnikov glavno vlakno zbudijo z navideznim dogodkom.
+        master.bind("<<Sporocilo>>", self.obdelaj_sporocila)
         
         # Če uporabnik zapre okno.
         master.protocol("WM_DELETE_WINDOW", lambda: self.prekini_igro(master))
@@ -376,22 +213,38 @@ class Gui():
         menu_igra.add_command(label="Človek proti računalniku", command=lambda: self.spremeni_nacin(master, 1))
         menu_igra.add_command(label="Človek proti človeku", command=lambda: self.spremeni_nacin(master, 2))
         menu_igra.add_command(label="Računalnik proti računalniku", command=lambda: self.spremeni_nacin(master, 3))
+        menu_igra.add_separator()
+        menu_igra.add_checkbutton(label="Premišljevanje med potezo človeka", variable=self.premisljevanje)
+        menu_igra.add_checkbutton(label="Mizerna igra (kdor položi zadnjo domino, izgubi)", variable=self.mizerna,
+                                  command=lambda: self.spremeni_pravila(master))
 
         # Podmenu za izbiro velikosti
         menu_velikost = tkinter.Menu(menu)
         menu.add_cascade(label="Velikost", menu=menu_velikost)
-        menu_velikost.add_command(label="5x5", command=lambda: self.spremeni_velikost(master, 5))
-        menu_velikost.add_command(label="6x6", command=lambda: self.spremeni_velikost(master, 6))
-        menu_velikost.add_command(label="7x7", command=lambda: self.spremeni_velikost(master, 7))
+        for velikost in KVADRATNE_VELIKOSTI:
+            menu_velikost.add_command(label="{0}x{1}".format(*velikost), command=lambda velikost=velikost: self.spremeni_velikost(master, velikost))
+        menu_velikost.add_separator()
+        for velikost in PRAVOKOTNE_VELIKOSTI:
+            menu_velikost.add_command(label="{0}x{1}".format(*velikost), command=lambda velikost=velikost: self.spremeni_velikost(master, velikost))
 
         # Podmenu za izbiro težavnosti
         menu_tezavnost = tkinter.Menu(menu)
         menu.add_cascade(label="Težavnost", menu=menu_tezavnost)
-        menu_tezavnost.add_command(label="Težko (alfa-beta rezanje)", command=lambda: self.spremeni_tezavnost(master, 3))
-        menu_tezavnost.add_command(label="Lahko (minimax)", command=lambda: self.spremeni_tezavnost(master, 2))
+        menu_tezavnost.add_command(label="Popolno (točen izračun z nimberji oz. mizernim rešiteljem)", command=lambda: self.spremeni_tezavnost(master, POPOLNO))
+        menu_tezavnost.add_command(label="Težko (alfa-beta rezanje, 3 s)", command=lambda: self.spremeni_tezavnost(master, TEZKO))
+        menu_tezavnost.add_command(label="Srednje (alfa-beta rezanje, 0,5 s)", command=lambda: self.spremeni_tezavnost(master, SREDNJE))
+        menu_tezavnost.add_command(label="Lahko (minimax, 0,3 s)", command=lambda: self.spremeni_tezavnost(master, LAHKO))
+        menu_tezavnost.add_command(label="Monte Carlo (MCTS, 3 s, za velike plošče)", command=lambda: self.spremeni_tezavnost(master, MONTE_CARLO))
+
+        # Podmenu za izbiro števila procesov
+        menu_procesi = tkinter.Menu(menu)
+        menu.add_cascade(label="Procesi", menu=menu_procesi)
+        menu_procesi.add_command(label="1 (zaporedno)", command=lambda: self.spremeni_procese(master, 1))
+        for procesi in sorted({2, 4, os.cpu_count() or 1} - {1}):
+            menu_procesi.add_command(label=str(procesi), command=lambda procesi=procesi: self.spremeni_procese(master, procesi))
 
         self.napis = tkinter.StringVar(master, value = "Dobrodošli!")
-        tkinter.Label(master, textvariable = self.napis).grid(row = self.velikost + 1, column = 1)
+        tkinter.Label(master, textvariable = self.napis).grid(row = 2, column = 1)
         
         self.pripravi_igro(master)
 
@@ -413,21 +266,55 @@ class Gui():
         
     def zacni_igro(self, rdeci, modri):
         """Pripravi igralca in pokliče rdečega, da zaigra."""
-        self.plosca.delete(POKRITO)
-        self.igra = Igra(self.velikost)
+        for vrstica in self.polja:
+            for polje in vrstica:
+                self.plosca.itemconfig(polje, fill=BARVA_PLOSCE)
+        self.igra = Igra(*self.velikost, mizerna=self.mizerna.get())
         self.rdeci = rdeci
         self.modri = modri
-        self.napis.set("Dobrodošli v Cram! Igra je pripravljena in ste na potezi.")
+        if self.igra.mizerna:
+            self.napis.set("Dobrodošli v mizerni Cram! Kdor položi zadnjo domino, izgubi. Ste na potezi.")
+        else:
+            self.napis.set("Dobrodošli v Cram! Igra je pripravljena in ste na potezi.")
         self.rdeci.igraj()
 
     def prekini_igro(self, master):
         """Sporoči igralcem, da nehajo razmišljati in zapre okno."""
-        self.rdeci.prekini()
-        self.modri.prekini()
+        self.ustavi_igralce()
+        zapri_iskalce()
         master.destroy()
+
+    def ustavi_igralce(self):
+        """Sporoči igralcem, da nehajo razmišljati. Ne čaka, da se vlakna končajo."""
+        if self.rdeci is not None:
+            self.rdeci.prekini()
+        if self.modri is not None:
+            self.modri.prekini()
+
+    def sporoci(self, igralec, algoritem, vrsta, podatki):
+        """Kliče se v vlaknu računalnika: doda sporočilo v vrsto in zbudi glavno vlakno."""
+        self.sporocila.put((igralec, algoritem, vrsta, podatki))
+        try:
+            self.master.event_generate("<<Sporocilo>>", when="tail")
+        except (tkinter.TclError, RuntimeError):
+            pass # Okno je že zaprto.
+
+    def obdelaj_sporocila(self, event):
+        """Sporočila iz vrste preda igralcem, ki so jih poslali, če so še v igri."""
+        while True:
+            try:
+                (igralec, algoritem, vrsta, podatki) = self.sporocila.get_nowait()
+            except queue.Empty:
+                break
+            if igralec is self.rdeci or igralec is self.modri:
+                igralec.sprejmi(algoritem, vrsta, podatki)
         
     def koncaj_igro(self, zmagovalec):
         """Igre je konec."""
+        self.ustavi_igralce() # Računalnik je morda premišljeval o potezi, ki ni bila odigrana.
+        if self.zapisi is not None:
+            with PisecIger(self.zapisi) as pisec:
+                pisec.zapisi_igro(self.igra)
         self.napis.set("Zmagal je {0}. Za ponovno igro kliknite na ploščo.".format(zmagovalec))
         self.plosca.bind("<Button-1>", self.ponovi_igro)
 
@@ -440,37 +327,59 @@ class Gui():
             self.plosca.after(500, self.ponovi_igro)
         
     def spremeni_nacin(self, master, nacin):
+        self.ustavi_igralce()
         self.plosca.destroy()
         self.nacin = nacin
         self.pripravi_igro(master)
 
     def spremeni_velikost(self, master, velikost):
+        self.ustavi_igralce()
         self.plosca.destroy()
         self.velikost = velikost
         self.pripravi_igro(master)
 
+    def spremeni_pravila(self, master):
+        """Uporabnik je vklopil ali izklopil mizerno igro, zato začnemo novo igro."""
+        self.ustavi_igralce()
+        self.plosca.destroy()
+        self.pripravi_igro(master)
+
     def spremeni_tezavnost(self, master, tezavnost):
+        self.ustavi_igralce()
         self.plosca.destroy()
         self.tezavnost = tezavnost
         self.pripravi_igro(master)
 
+    def spremeni_procese(self, master, procesi):
+        self.ustavi_igralce()
+        self.plosca.destroy()
+        self.procesi = procesi
+        self.pripravi_igro(master)
+
     def naredi_polje(self, master, velikost):
-        """Ustvari polje."""
-        self.plosca = tkinter.Canvas(master, width=velikost*ENOTA, height=velikost*ENOTA, bg="AntiqueWhite1")
+        """Ustvari polje. Za vsako polje plošče enkrat ustvari pravokotnik, ki ga med igro le prebarvamo."""
+        (vrstice, stolpci) = velikost
+        self.enota = min(NAJVECJA_ENOTA, NAJVECJA_PLOSCA // max(vrstice, stolpci))
+        d = self.enota
+        self.plosca = tkinter.Canvas(master, width=stolpci*d, height=vrstice*d, bg=BARVA_PLOSCE)
         self.plosca.grid(row=1, column=1)
         master.resizable(0,0) # Onemogoči resize.
+        self.polja = [[self.plosca.create_rectangle(j*d, i*d, (j+1)*d, (i+1)*d, fill=BARVA_PLOSCE, width=0)
+                       for j in range(stolpci)] for i in range(vrstice)]
 
     def naredi_crte(self, velikost):
         """Na polju nariše črte."""
-        d = ENOTA
-        for i in range(1, velikost):
-            self.plosca.create_line(i*d, 0*d, i*d, velikost*d, fill="light slate grey", width=3)
-            self.plosca.create_line(0*d, i*d, velikost*d, i*d, fill="light slate grey", width=3)
+        (vrstice, stolpci) = velikost
+        d = self.enota
+        for j in range(1, stolpci):
+            self.plosca.create_line(j*d, 0*d, j*d, vrstice*d, fill="light slate grey", width=3)
+        for i in range(1, vrstice):
+            self.plosca.create_line(0*d, i*d, stolpci*d, i*d, fill="light slate grey", width=3)
 
     def plosca_klik(self, event):
         """Obdela klike na ploščo."""
-        i1 = event.x // ENOTA
-        j1 = event.y // ENOTA
+        i1 = event.y // self.enota # Vrstica
+        j1 = event.x // self.enota # Stolpec
         if self.igra.na_potezi == RDECI:
             self.rdeci.klik((i1,j1)) # Rdeči dobi pozicijo1. 
         elif self.igra.na_potezi == MODRI:
@@ -480,8 +389,8 @@ class Gui():
 
     def plosca_spust(self, event):
         """Obdela spuste na ploščo."""
-        i2 = event.x // ENOTA
-        j2 = event.y // ENOTA
+        i2 = event.y // self.enota
+        j2 = event.x // self.enota
         if self.igra.na_potezi == RDECI:
             self.rdeci.spust((i2,j2)) # Rdeči dobi pozicijo2. 
         elif self.igra.na_potezi == MODRI:
@@ -489,42 +398,43 @@ class Gui():
         else:
             pass
 
-    def pobarvaj_rdece(self, x1, y1, x2, y2):
-        """Dano potezo pobarva rdeče."""
-        self.plosca.create_rectangle(x1*ENOTA, y1*ENOTA, (x1+1)*ENOTA, (y1+1)*ENOTA, fill="red", tag=POKRITO)
-        self.plosca.create_rectangle(x2*ENOTA, y2*ENOTA, (x2+1)*ENOTA, (y2+1)*ENOTA, fill="red", tag=POKRITO)
-        
-    def pobarvaj_modro(self, x1, y1, x2, y2):
-        """Dano potezo pobarva modro."""
-        self.plosca.create_rectangle(x1*ENOTA, y1*ENOTA, (x1+1)*ENOTA, (y1+1)*ENOTA, fill="blue", tag=POKRITO)
-        self.plosca.create_rectangle(x2*ENOTA, y2*ENOTA, (x2+1)*ENOTA, (y2+1)*ENOTA, fill="blue", tag=POKRITO)
+    def pobarvaj_domino(self, i1, j1, i2, j2, igralec):
+        """Polji domine pobarva z barvo igralca."""
+        self.plosca.itemconfig(self.polja[i1][j1], fill=BARVE[igralec])
+        self.plosca.itemconfig(self.polja[i2][j2], fill=BARVE[igralec])
 
     def naredi_potezo(self, x1, y1, x2, y2):
         """Nariše dano potezo in pokliče nasprotnika da zaigra. """
+        (x1, y1, x2, y2) = self.igra.normaliziraj_potezo(x1, y1, x2, y2)
         (igralec, stanje) = self.igra.naredi_potezo(x1, y1, x2, y2)
         if stanje is not None: # Veljavna poteza.
-            # Narišemo potezo.
-            if igralec == RDECI:
-                self.pobarvaj_rdece(x1, y1, x2, y2) # Pobarva rdeče.
-            elif igralec == MODRI:
-                self.pobarvaj_modro(x1, y1, x2, y2) # Pobarva modro.
+            self.pobarvaj_domino(x1, y1, x2, y2, igralec) # Narišemo potezo.
             # Dodelimo potezo.
             if stanje == NI_KONEC: # Igra ni konec.
                 if self.igra.na_potezi == RDECI:
                     self.napis.set("Na potezi je rdeči igralec.")
-                    self.plosca.after(200, self.rdeci.igraj)
+                    self.plosca.after_idle(self.rdeci.igraj)
+                    self.plosca.after_idle(self.modri.cakaj)
                 elif self.igra.na_potezi == MODRI:
                     self.napis.set("Na potezi je modri igralec.")
-                    self.plosca.after(200, self.modri.igraj)
-            else: # Igre je konec.
-                self.koncaj_igro(igralec)
+                    self.plosca.after_idle(self.modri.igraj)
+                    self.plosca.after_idle(self.rdeci.cakaj)
+            else: # Igre je konec, na potezi je ostal zmagovalec.
+                self.koncaj_igro(self.igra.na_potezi)
         else: # Neveljavna poteza.
             pass
         
 ######################################################################
 #GLAVNI PROGRAM
-        
-root = tkinter.Tk()
-root.title("Cram")
-aplikacija = Gui(root)
-root.mainloop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Igra Cram.")
+    parser.add_argument("--procesi", type=int, default=1, help="število procesov za iskanje računalnika")
+    parser.add_argument("--mizerna", action="store_true", help="začne z mizerno igro")
+    parser.add_argument("--dnevnik", help="datoteka, v katero računalnik za vsako potezo zapiše statistiko iskanja (JSON lines)")
+    parser.add_argument("--zapisi", help="datoteka, v katero dodamo zapis vsake končane igre")
+    argumenti = parser.parse_args()
+    root = tkinter.Tk()
+    root.title("Cram")
+    aplikacija = Gui(root, argumenti.procesi, argumenti.dnevnik, argumenti.mizerna, argumenti.zapisi)
+    root.mainloop()
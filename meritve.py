@@ -0,0 +1,313 @@
+"""Meritve hitrosti pogona na stalnem naboru pozicij. Izmeri generiranje potez, oceno pozicije, število
+vozlišč na sekundo in čas do posamezne globine za minimax in alfa-beta ter preveri, ali alfa-beta izbere
+zmagovalno potezo, kjer jo poznamo. Če je nameščen NumPy, na velikih ploščah preveri in izmeri še vektorske
+ocene naslednikov. Rezultate zapiše v datoteko JSON in jih lahko primerja z osnovo.
+
+Primer:
+    python meritve.py --izhod osnova_meritev.json
+    python meritve.py --osnova osnova_meritev.json --dovoljeno 0.15
+    python meritve.py --izboljsave"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from motor import (Algoritem, TranspozicijskaTabela, igra_iz_opisa, MINIMAX, ALFABETA, PVS, MORILCI, ZGODOVINA, PAKETI,
+                   ASPIRACIJA, PRIVZETE_IZBOLJSAVE, NAJMANJ_ZA_NUMPY)
+
+try:
+    import numpy
+except ImportError: # Brez NumPy meritev vektorskih ocen izpustimo.
+    numpy = None
+
+# Pozicije so (velikost, faza, plošča, zmagovalne poteze). Na plošči je "#" pokrito in "." nepokrito polje.
+# Zmagovalne poteze za igralca na potezi je izračunal Resevalec; prazen seznam pomeni izgubljeno pozicijo,
+# None pa, da rešitev ni znana (odprtja na 6x6 in 7x7 so za točen izračun prevelika).
+POZICIJE = [
+    (5, "odprtje", ["..##.", ".##..", ".....", ".....", "....."],
+     [(0, 0, 1, 0), (1, 3, 2, 3), (2, 2, 3, 2), (2, 4, 3, 4), (3, 2, 4, 2), (3, 3, 4, 3),
+      (0, 0, 0, 1), (2, 0, 2, 1), (2, 3, 2, 4), (3, 3, 3, 4), (4, 0, 4, 1), (4, 2, 4, 3)]),
+    (5, "odprtje", [".....", "..#..", "..#..", "#....", "#...."], []),
+    (5, "sredina", ["..##.", "..##.", "##...", "##.##", "....."],
+     [(0, 0, 1, 0), (0, 1, 1, 1), (0, 4, 1, 4), (3, 2, 4, 2), (0, 0, 0, 1), (1, 0, 1, 1),
+      (2, 3, 2, 4), (4, 0, 4, 1), (4, 3, 4, 4)]),
+    (5, "sredina", ["##.#.", "##.#.", ".##..", "..#..", "..#.."], [(0, 4, 1, 4), (2, 3, 2, 4)]),
+    (5, "konec", [".##..", "###..", "#####", ".####", "..##."],
+     [(0, 3, 1, 3), (0, 4, 1, 4), (3, 0, 4, 0), (0, 3, 0, 4), (1, 3, 1, 4), (4, 0, 4, 1)]),
+    (5, "konec", ["####.", "###..", "###..", "#..##", "#.##."],
+     [(0, 4, 1, 4), (1, 3, 2, 3), (1, 4, 2, 4), (3, 1, 4, 1), (1, 3, 1, 4), (2, 3, 2, 4), (3, 1, 3, 2)]),
+    (6, "odprtje", ["..#...", "..#..#", ".....#", "......", "......", "......"], None),
+    (6, "odprtje", ["......", "......", ".....#", ".....#", "......", "...##."], None),
+    (6, "sredina", [".##...", "###.##", ".##...", ".#....", "#...##", "#...##"],
+     [(2, 3, 2, 4), (3, 2, 3, 3), (4, 2, 4, 3), (5, 2, 5, 3)]),
+    (6, "sredina", ["..#...", "..#.##", ".##...", "##....", "..####", "####.."],
+     [(0, 3, 1, 3), (2, 4, 3, 4), (0, 4, 0, 5), (3, 2, 3, 3), (3, 4, 3, 5)]),
+    (6, "konec", ["...###", "#..##.", "###.#.", ".##...", "######", "######"], [(3, 4, 3, 5)]),
+    (6, "konec", [".###..", ".#.#..", "######", "#.##..", "######", "####.."],
+     [(0, 0, 1, 0), (0, 4, 1, 4), (0, 5, 1, 5), (0, 4, 0, 5), (1, 4, 1, 5), (3, 4, 3, 5), (5, 4, 5, 5)]),
+    (7, "odprtje", [".......", "..#....", "..#....", ".##....", "..#....", "..#....", "......."], None),
+    (7, "odprtje", [".......", "##.....", ".......", "....#..", "....#..", "#......", "#......"], None),
+    (7, "sredina", [".#####.", ".#.#...", ".###...", ".......", "..##...", "#...##.", "#.##.##"], [(3, 1, 3, 2)]),
+    (7, "sredina", [".#.####", ".###...", "####...", ".......", "...##..", "##.###.", "...#..."],
+     [(1, 6, 2, 6), (2, 4, 3, 4), (3, 2, 4, 2), (1, 4, 1, 5), (2, 5, 2, 6), (3, 4, 3, 5),
+      (4, 0, 4, 1), (4, 1, 4, 2), (4, 5, 4, 6), (6, 1, 6, 2)]),
+    (7, "konec", ["##..##.", "##.#..#", "...####", "#.##.#.", "#...###", "#####.#", "######."],
+     [(0, 2, 0, 3), (4, 2, 4, 3)]),
+    (7, "konec", [".####..", "#####..", "#.#.###", "#.#####", "###.##.", "#.#..##", "###...."], [(6, 4, 6, 5)])
+]
+
+# Odprtja na velikih ploščah, kjer ima pozicija vsaj NAJMANJ_ZA_NUMPY naslednikov, zato jih Igra.ocene_naslednikov
+# oceni z NumPy. Na njih preverimo in izmerimo vektorske ocene.
+VELIKE_POZICIJE = [
+    ["." * 12] * 12,
+    ["............", "...##.......", "............", "......#.....", "......#.....", "............",
+     "............", ".........##.", "............", "..#.........", "..#.........", "............"],
+    ["..........."] * 5 + ["....##....."] + ["..........."] * 5
+]
+
+# Globina iskanja za vsako metodo in fazo igre.
+GLOBINE = {
+    MINIMAX : {"odprtje": 3, "sredina": 3, "konec": 5},
+    ALFABETA : {"odprtje": 4, "sredina": 6, "konec": 10}
+}
+
+# Nabori izboljšav alfa-beta, ki jih primerjamo po številu vozlišč pri enaki globini.
+NABORI_IZBOLJSAV = [
+    ("brez", frozenset()),
+    ("morilci", frozenset((MORILCI,))),
+    ("zgodovina", frozenset((ZGODOVINA,))),
+    ("pvs", frozenset((PVS,))),
+    ("morilci+zgodovina", frozenset((MORILCI, ZGODOVINA))),
+    ("privzete", PRIVZETE_IZBOLJSAVE),
+    ("privzete brez paketov", PRIVZETE_IZBOLJSAVE - {PAKETI}),
+    ("privzete+aspiracija", PRIVZETE_IZBOLJSAVE | {ASPIRACIJA})
+]
+
+PONOVITVE_GENERIRANJA = 2000 # Kolikokrat v eni meritvi generiramo poteze oz. ocenimo vsako pozicijo.
+NAJKRAJSI_PRIMERLJIV_CAS = 0.05 # Krajših iskanj posameznih pozicij ne primerjamo z osnovo, ker so preveč nenatančna.
+
+def ime_pozicije(indeks):
+    (velikost, faza, _, _) = POZICIJE[indeks]
+    return "{0}x{0} {1} {2}".format(velikost, faza, indeks)
+
+def najkrajsi_cas(funkcija, ponovitve):
+    """Vrne najkrajši čas izvajanja funkcije v danem številu ponovitev."""
+    najkrajsi = float("inf")
+    for k in range(ponovitve):
+        zacetek = time.perf_counter()
+        funkcija()
+        najkrajsi = min(najkrajsi, time.perf_counter() - zacetek)
+    return najkrajsi
+
+def meri_generiranje(igre, ponovitve):
+    """Vrne število klicev domine() in veljavne_poteze() na sekundo."""
+    def domine():
+        for igra in igre:
+            for k in range(PONOVITVE_GENERIRANJA):
+                igra.domine()
+    def veljavne_poteze():
+        for igra in igre:
+            for k in range(PONOVITVE_GENERIRANJA):
+                igra.veljavne_poteze()
+    klici = len(igre) * PONOVITVE_GENERIRANJA
+    return {
+        "domine/s": klici / najkrajsi_cas(domine, ponovitve),
+        "veljavne_poteze/s": klici / najkrajsi_cas(veljavne_poteze, ponovitve)
+    }
+
+def meri_oceno(igre, ponovitve):
+    """Vrne število ocen pozicije na sekundo: z odigraj/razveljavi ob sprotnem posodabljanju,
+    z oceno vseh naslednikov naenkrat in s ponovnim izračunom ocene iz bitnih mask."""
+    poteze = [(igra, igra.domine()) for igra in igre]
+    def sprotno():
+        for (igra, domine) in poteze:
+            for k in range(PONOVITVE_GENERIRANJA // 10):
+                for domina in domine:
+                    igra.odigraj(domina)
+                    igra.ocena
+                    igra.razveljavi(domina)
+    def nasledniki():
+        for (igra, domine) in poteze:
+            for k in range(PONOVITVE_GENERIRANJA // 10):
+                igra.ocene_naslednikov(domine)
+    def na_novo():
+        for igra in igre:
+            for k in range(PONOVITVE_GENERIRANJA):
+                igra.izracunaj_oceno()
+    ocene = sum(len(domine) for (igra, domine) in poteze) * (PONOVITVE_GENERIRANJA // 10)
+    return {
+        "odigraj_ocena_razveljavi/s": ocene / najkrajsi_cas(sprotno, ponovitve),
+        "ocene_naslednikov/s": ocene / najkrajsi_cas(nasledniki, ponovitve),
+        "izracunaj_oceno/s": len(igre) * PONOVITVE_GENERIRANJA / najkrajsi_cas(na_novo, ponovitve)
+    }
+
+def meri_vektorsko(ponovitve):
+    """Na velikih pozicijah preveri, ali so ocene naslednikov z NumPy enake ocenam po odigrani potezi, in
+    izmeri hitrost obeh načinov. Vrne (hitrosti, ujemanje) oz. None, če NumPy ni nameščen."""
+    if numpy is None:
+        return None
+    igre = [igra_iz_opisa(plosca) for plosca in VELIKE_POZICIJE]
+    assert all(igra.stevilo_potez() >= NAJMANJ_ZA_NUMPY for igra in igre)
+    pravilne = 0
+    for igra in igre:
+        domine = igra.domine()
+        ocene = []
+        for domina in domine:
+            igra.odigraj(domina)
+            ocene.append(igra.ocena)
+            igra.razveljavi(domina)
+        pravilne += igra.ocene_naslednikov(domine) == ocene
+    hitrosti = meri_oceno(igre, ponovitve)
+    return ({"odigraj_ocena_razveljavi_velike/s": hitrosti["odigraj_ocena_razveljavi/s"],
+             "ocene_naslednikov_numpy/s": hitrosti["ocene_naslednikov/s"]},
+            {"pravilne": pravilne, "znane": len(igre)})
+
+def meri_iskanje(igra, metoda, globina, ponovitve, izboljsave=PRIVZETE_IZBOLJSAVE):
+    """Preišče pozicijo do dane globine in vrne število vozlišč, čase do posameznih globin in potezo.
+    Čas je najkrajši v danem številu ponovitev, vsaka se začne s prazno tabelo."""
+    najboljsi = None
+    for k in range(ponovitve):
+        tabela = TranspozicijskaTabela() if metoda == ALFABETA else None
+        algoritem = Algoritem(igra.kopija_igre(), tabela)
+        algoritem.izboljsave = izboljsave
+        zacetek = time.perf_counter()
+        domina = algoritem.iterativno_poglabljanje(metoda, float("inf"), najvecja_globina=globina)
+        cas = time.perf_counter() - zacetek
+        if najboljsi is None or cas < najboljsi["cas"]:
+            najboljsi = {
+                "globina": algoritem.globina,
+                "vozlisca": algoritem.vozlisca,
+                "cas": cas,
+                "vozlisca/s": algoritem.vozlisca / cas,
+                "casi_globin": algoritem.casi_globin,
+                "vrednost": algoritem.vrednost,
+                "poteza": list(igra.poteza_domine(domina))
+            }
+    return najboljsi
+
+def meritve(ponovitve=3, izpis=True):
+    """Izvede vse meritve in vrne slovar z rezultati."""
+    igre = [igra_iz_opisa(plosca) for (_, _, plosca, _) in POZICIJE]
+    rezultati = {
+        "okolje": {"python": sys.version.split()[0], "platforma": platform.platform(), "procesor": platform.processor()},
+        "generiranje": meri_generiranje(igre, ponovitve),
+        "ocena": meri_oceno(igre, ponovitve),
+        "iskanje": {},
+        "ujemanje": {}
+    }
+    vektorsko = meri_vektorsko(ponovitve)
+    if vektorsko is not None:
+        rezultati["ocena"].update(vektorsko[0])
+        rezultati["ujemanje"]["numpy"] = vektorsko[1]
+    for metoda in (MINIMAX, ALFABETA):
+        pozicije = {}
+        pravilne = 0
+        znane = 0
+        for (indeks, (velikost, faza, plosca, zmagovalne)) in enumerate(POZICIJE):
+            rezultat = meri_iskanje(igre[indeks], metoda, GLOBINE[metoda][faza], ponovitve)
+            if zmagovalne:
+                znane += 1
+                rezultat["zmagovalna"] = tuple(rezultat["poteza"]) in zmagovalne
+                pravilne += rezultat["zmagovalna"]
+            pozicije[ime_pozicije(indeks)] = rezultat
+            if izpis:
+                print("{0:<10} {1:<18} globina {2}: {3:>8} vozlišč, {4:7.3f} s".format(
+                    metoda, ime_pozicije(indeks), rezultat["globina"], rezultat["vozlisca"], rezultat["cas"]))
+        vozlisca = sum(rezultat["vozlisca"] for rezultat in pozicije.values())
+        cas = sum(rezultat["cas"] for rezultat in pozicije.values())
+        rezultati["iskanje"][metoda] = {"pozicije": pozicije, "vozlisca": vozlisca, "cas": cas, "vozlisca/s": vozlisca / cas}
+        rezultati["ujemanje"][metoda] = {"pravilne": pravilne, "znane": znane}
+    return rezultati
+
+def meri_izboljsave(izpis=True):
+    """Za vsak nabor izboljšav z alfa-beta preišče vse pozicije do globin iz GLOBINE. Vrne slovar
+    nabor -> velikost plošče -> število vozlišč, ki za razliko od časa ni odvisno od računalnika."""
+    igre = [igra_iz_opisa(plosca) for (_, _, plosca, _) in POZICIJE]
+    velikosti = sorted({velikost for (velikost, _, _, _) in POZICIJE})
+    rezultati = {}
+    for (ime, izboljsave) in NABORI_IZBOLJSAV:
+        vozlisca = dict.fromkeys(velikosti, 0)
+        for (indeks, (velikost, faza, _, _)) in enumerate(POZICIJE):
+            vozlisca[velikost] += meri_iskanje(igre[indeks], ALFABETA, GLOBINE[ALFABETA][faza], 1, izboljsave)["vozlisca"]
+        rezultati[ime] = vozlisca
+    if izpis:
+        osnova = rezultati[NABORI_IZBOLJSAV[0][0]]
+        print("{0:<20}".format("izboljšave") + "".join("{0:>18}".format("{0}x{0}".format(velikost)) for velikost in velikosti))
+        for (ime, vozlisca) in rezultati.items():
+            print("{0:<20}".format(ime) + "".join("{0:>10} ({1:+4.0%})".format(vozlisca[velikost], vozlisca[velikost] / osnova[velikost] - 1)
+                                               for velikost in velikosti))
+    return rezultati
+
+def kazalniki(rezultati):
+    """Vrne slovar ime -> (vrednost, True, če je večja vrednost boljša) za primerjavo z osnovo."""
+    kazalniki = {}
+    for skupina in ("generiranje", "ocena"):
+        for (ime, vrednost) in rezultati[skupina].items():
+            kazalniki[skupina + " " + ime] = (vrednost, True)
+    for (metoda, iskanje) in rezultati["iskanje"].items():
+        kazalniki[metoda + " vozlisca/s"] = (iskanje["vozlisca/s"], True)
+        kazalniki[metoda + " cas"] = (iskanje["cas"], False)
+        for (ime, pozicija) in iskanje["pozicije"].items():
+            if pozicija["cas"] >= NAJKRAJSI_PRIMERLJIV_CAS:
+                kazalniki[metoda + " " + ime + " cas"] = (pozicija["cas"], False)
+    return kazalniki
+
+def primerjaj(rezultati, osnova, dovoljeno):
+    """Primerja rezultate z osnovo in vrne seznam opisov poslabšanj. Hitrost se je poslabšala, če je
+    kazalnik za več kot delež dovoljeno slabši; ujemanje z rešitvami se ne sme zmanjšati."""
+    poslabsanja = []
+    stari = kazalniki(osnova)
+    for (ime, (vrednost, vecja_je_boljsa)) in sorted(kazalniki(rezultati).items()):
+        if ime not in stari:
+            continue
+        stara = stari[ime][0]
+        if vecja_je_boljsa:
+            razmerje = stara / vrednost if vrednost else float("inf")
+        else:
+            razmerje = vrednost / stara if stara else float("inf")
+        if razmerje > 1 + dovoljeno:
+            poslabsanja.append("{0}: {1:.4g} -> {2:.4g} ({3:+.0%})".format(ime, stara, vrednost, razmerje - 1))
+    for (metoda, ujemanje) in rezultati["ujemanje"].items():
+        staro = osnova.get("ujemanje", {}).get(metoda)
+        if staro is not None and ujemanje["pravilne"] < staro["pravilne"]:
+            poslabsanja.append("{0} ujemanje z rešitvami: {1} -> {2}".format(metoda, staro["pravilne"], ujemanje["pravilne"]))
+    return poslabsanja
+
+def izpisi_povzetek(rezultati):
+    for skupina in ("generiranje", "ocena"):
+        for (ime, vrednost) in rezultati[skupina].items():
+            print("{0:<34} {1:>12.0f}".format(ime, vrednost))
+    for (metoda, iskanje) in rezultati["iskanje"].items():
+        ujemanje = rezultati["ujemanje"][metoda]
+        print("{0:<10} {1:>10} vozlišč {2:7.2f} s {3:>10.0f} vozlišč/s, zmagovalnih potez {4}/{5}".format(
+            metoda, iskanje["vozlisca"], iskanje["cas"], iskanje["vozlisca/s"], ujemanje["pravilne"], ujemanje["znane"]))
+    if "numpy" in rezultati["ujemanje"]:
+        print("numpy      ocene naslednikov enake ocenam po potezi: {pravilne}/{znane}".format(**rezultati["ujemanje"]["numpy"]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meritve hitrosti pogona igre Cram.")
+    parser.add_argument("--izhod", help="datoteka JSON, v katero zapišemo rezultate")
+    parser.add_argument("--osnova", help="datoteka JSON z osnovnimi rezultati za primerjavo")
+    parser.add_argument("--dovoljeno", type=float, default=0.15, help="dovoljeno poslabšanje hitrosti (delež)")
+    parser.add_argument("--ponovitve", type=int, default=3, help="število ponovitev vsake meritve")
+    parser.add_argument("--izboljsave", action="store_true", help="primerja število vozlišč alfa-beta z nabori izboljšav")
+    argumenti = parser.parse_args()
+    if argumenti.izboljsave:
+        meri_izboljsave()
+        sys.exit(0)
+    rezultati = meritve(argumenti.ponovitve)
+    izpisi_povzetek(rezultati)
+    if argumenti.izhod:
+        with open(argumenti.izhod, "w") as datoteka:
+            json.dump(rezultati, datoteka, indent=2)
+    if argumenti.osnova:
+        with open(argumenti.osnova) as datoteka:
+            osnova = json.load(datoteka)
+        poslabsanja = primerjaj(rezultati, osnova, argumenti.dovoljeno)
+        for poslabsanje in poslabsanja:
+            print("Poslabšanje: " + poslabsanje)
+        if poslabsanja:
+            sys.exit(1)
+        print("Ni poslabšanj glede na osnovo.")
@@ -0,0 +1,2101 @@
+"""Igra Cram brez grafičnega vmesnika: pravila igre, iskanje poteze, rešitelj z nimberji in baza nimberjev.
+Modul ne uvozi tkinter, zato ga lahko uporabljajo skripte in procesi delavci."""
+
+import random
+import math
+import time
+import argparse
+import json
+import cProfile
+import pstats
+import os
+import mmap
+import struct
+import multiprocessing
+import threading
+import concurrent.futures
+
+try:
+    import numpy
+except ImportError: # NumPy ni obvezen: brez njega ocene naslednikov računamo v Pythonu.
+    numpy = None
+
+######################################################################
+## Igra
+
+RDECI = "rdeci"
+MODRI = "modri"
+NEPOKRITO = "belo"
+KONEC = "konec"
+NI_KONEC = "ni konec"
+
+def nasprotnik(igralec):
+    if igralec == RDECI:
+        return MODRI
+    elif igralec == MODRI:
+        return RDECI
+    else:
+        assert False, "nasprotnik: prepovedan nasprotnik"
+
+if hasattr(int, "bit_count"): # Python 3.10 ali novejši.
+    stevilo_bitov = int.bit_count
+else:
+    def stevilo_bitov(maska):
+        """Vrne število prižganih bitov v maski."""
+        return bin(maska).count("1")
+
+_simetrije = {} # Predpomnilnik preslikav za posamezne velikosti plošče.
+
+def simetrije_plosce(vrstice, stolpci):
+    """Vrne seznam simetrij plošče: 8 za kvadratno, za pravokotno pa le 4, ki ohranijo njeno obliko.
+    Vsaka simetrija je seznam, ki indeksu bita polja priredi indeks bita slike."""
+    if (vrstice, stolpci) not in _simetrije:
+        sirina = stolpci + 1
+        zi = vrstice - 1
+        zj = stolpci - 1
+        preslikave = [
+            (lambda i, j: (i, j), False),
+            (lambda i, j: (j, zi-i), True), # Zasuk za 90 stopinj.
+            (lambda i, j: (zi-i, zj-j), False), # Zasuk za 180 stopinj.
+            (lambda i, j: (zj-j, i), True), # Zasuk za 270 stopinj.
+            (lambda i, j: (zi-i, j), False), # Zrcaljenje vrstic.
+            (lambda i, j: (i, zj-j), False), # Zrcaljenje stolpcev.
+            (lambda i, j: (j, i), True), # Zrcaljenje čez glavno diagonalo.
+            (lambda i, j: (zj-j, zi-i), True) # Zrcaljenje čez stransko diagonalo.
+        ]
+        simetrije = []
+        for (preslikava, le_kvadratna) in preslikave:
+            if le_kvadratna and vrstice != stolpci:
+                continue
+            slike = list(range(vrstice * sirina))
+            for i in range(vrstice):
+                for j in range(stolpci):
+                    (i2, j2) = preslikava(i, j)
+                    slike[i * sirina + j] = i2 * sirina + j2
+            simetrije.append(slike)
+        _simetrije[(vrstice, stolpci)] = simetrije
+    return _simetrije[(vrstice, stolpci)]
+
+_inverzi = {}
+
+def inverzne_simetrije(vrstice, stolpci):
+    """Vrne seznam inverzov simetrij iz simetrije_plosce v istem vrstnem redu."""
+    if (vrstice, stolpci) not in _inverzi:
+        inverzi = []
+        for simetrija in simetrije_plosce(vrstice, stolpci):
+            inverz = list(range(len(simetrija)))
+            for (indeks, slika) in enumerate(simetrija):
+                inverz[slika] = indeks
+            inverzi.append(inverz)
+        _inverzi[(vrstice, stolpci)] = inverzi
+    return _inverzi[(vrstice, stolpci)]
+
+BITI_ZOBRIST = 64
+MASKA_ZOBRIST = (1 << BITI_ZOBRIST) - 1
+_zobrist = {} # Predpomnilnik Zobristovih tabel za posamezne velikosti plošče.
+
+def zobrist_plosce(vrstice, stolpci):
+    """Vrne Zobristove ključe polj in slovar, ki vsaki domini priredi spremembo ključa ob njeni postavitvi.
+    Ključi za vse simetrije so zloženi v eno število, k-ti ključ je v bitih od 64*k naprej."""
+    if (vrstice, stolpci) not in _zobrist:
+        sirina = stolpci + 1
+        generator = random.Random("{0}x{1}".format(vrstice, stolpci)) # Ključi so v vseh procesih enaki.
+        nakljucni = [generator.getrandbits(BITI_ZOBRIST) for polje in range(vrstice * sirina)]
+        simetrije = simetrije_plosce(vrstice, stolpci)
+        kljuci_polj = []
+        for polje in range(vrstice * sirina):
+            kljuc = 0
+            for (k, simetrija) in enumerate(simetrije):
+                kljuc |= nakljucni[simetrija[polje]] << (BITI_ZOBRIST * k)
+            kljuci_polj.append(kljuc)
+        spremembe = {}
+        for domina in crte_domin(vrstice, stolpci):
+            bit = domina & -domina
+            spremembe[domina] = kljuci_polj[bit.bit_length() - 1] ^ kljuci_polj[domina.bit_length() - 1]
+        _zobrist[(vrstice, stolpci)] = (kljuci_polj, spremembe)
+    return _zobrist[(vrstice, stolpci)]
+
+_crte = {} # Predpomnilnik vrstic in stolpcev, ki jih pokrijejo domine, za posamezne velikosti plošče.
+
+def crte_domin(vrstice, stolpci):
+    """Vrne slovar, ki vsaki domini priredi (vrstica, vrstica, stolpec, stolpec) njenih dveh polj."""
+    if (vrstice, stolpci) not in _crte:
+        sirina = stolpci + 1
+        crte = {}
+        for i in range(vrstice):
+            for j in range(stolpci):
+                polje = i * sirina + j
+                if i + 1 < vrstice:
+                    crte[(1 << polje) | (1 << (polje + sirina))] = (i, i + 1, j, j)
+                if j + 1 < stolpci:
+                    crte[(1 << polje) | (1 << (polje + 1))] = (i, i, j, j + 1)
+        _crte[(vrstice, stolpci)] = crte
+    return _crte[(vrstice, stolpci)]
+
+NAJMANJ_ZA_NUMPY = 192 # Pri manj naslednikih je računanje v Pythonu hitrejše od klicev NumPy.
+_tabele_numpy = {}
+
+def tabele_numpy(vrstice, stolpci):
+    """Vrne tabele NumPy za hkratno ocenjevanje naslednikov na plošči dane velikosti. Vrstice in stolpci
+    so v skupnem seznamu črt (najprej vrstice), vrednosti vrstic in stolpcev pa v skupni tabeli vrednosti.
+    Vrne (slovar domina -> indeks, črte domin, odmiki vrednosti, popravki, tabela vrednosti); tabele domin
+    imajo 4 vrstice, po eno za vsako polje domine v vrstici oz. stolpcu, in stolpec za vsako domino.
+    Popravek je 1, ko je druga črta domine enaka prvi in je njeno število nepokritih polj že zmanjšano."""
+    if (vrstice, stolpci) not in _tabele_numpy:
+        crte = crte_domin(vrstice, stolpci)
+        indeksi = {domina: k for (k, domina) in enumerate(crte)}
+        crte_domin_ = []
+        odmiki = []
+        popravki = []
+        for (i1, i2, j1, j2) in crte.values():
+            crte_domin_.append((i1, i2, vrstice + j1, vrstice + j2))
+            odmiki.append((0, 0, stolpci + 1, stolpci + 1))
+            popravki.append((0, int(i1 == i2), 0, int(j1 == j2)))
+        vrednosti = vrednosti_crt(stolpci) + vrednosti_crt(vrstice)
+        _tabele_numpy[(vrstice, stolpci)] = (indeksi, numpy.array(crte_domin_, dtype=numpy.intp).T,
+                                              numpy.array(odmiki, dtype=numpy.intp).T, numpy.array(popravki, dtype=numpy.intp).T,
+                                              numpy.array(vrednosti, dtype=numpy.int64))
+    return _tabele_numpy[(vrstice, stolpci)]
+
+def preberi_velikost(opis):
+    """Iz opisa velikosti plošče "N" ali "NxM" vrne (vrstice, stolpci)."""
+    (vrstice, _, stolpci) = opis.lower().partition("x")
+    return (int(vrstice), int(stolpci or vrstice))
+
+def preslikaj(maska, simetrija):
+    """Vrne sliko maske pri dani simetriji."""
+    slika = 0
+    while maska:
+        bit = maska & -maska
+        maska ^= bit
+        slika |= 1 << simetrija[bit.bit_length() - 1]
+    return slika
+
+class Igra():
+    def __init__(self, vrstice, stolpci=None, mizerna=False):
+        if stolpci is None: # Kvadratna plošča.
+            stolpci = vrstice
+        self.vrstice = vrstice
+        self.stolpci = stolpci
+        self.velikost = (vrstice, stolpci)
+        self.mizerna = mizerna # V mizerni igri igralec, ki položi zadnjo domino, izgubi.
+        # Polje (i,j) je predstavljeno z bitom i*sirina + j. Vsaka vrstica ima na koncu
+        # še en stražni bit, ki ni nikoli prost, zato se poteze pri zamikih ne prelivajo v naslednjo vrstico.
+        self.sirina = stolpci + 1
+        vrstica = (1 << stolpci) - 1
+        self.maske_vrstic = [vrstica << (i * self.sirina) for i in range(vrstice)]
+        stolpec = 0
+        for i in range(vrstice):
+            stolpec |= 1 << (i * self.sirina)
+        self.maske_stolpcev = [stolpec << j for j in range(stolpci)]
+        self.vsa_polja = 0
+        for maska in self.maske_vrstic:
+            self.vsa_polja |= maska
+        self.simetrije = simetrije_plosce(vrstice, stolpci)
+        self.inverzi = inverzne_simetrije(vrstice, stolpci)
+        (self.kljuci_polj, self.zobrist_domin) = zobrist_plosce(vrstice, stolpci)
+        self.crte_domin = crte_domin(vrstice, stolpci)
+        self.vrednosti_vrstic = vrednosti_crt(stolpci) # Vrstica ima toliko polj, kolikor je stolpcev.
+        self.vrednosti_stolpcev = vrednosti_crt(vrstice)
+        self.zobrist = 0 # Zloženi Zobristovi ključi pozicije za vse simetrije.
+        self.rdeca = 0 # Polja, ki jih pokrivajo rdeče domine.
+        self.modra = 0 # Polja, ki jih pokrivajo modre domine.
+        # Število nepokritih polj v vsaki vrstici in stolpcu ter vsota njihovih vrednosti (ocena pozicije).
+        self.prosta_v_vrsticah = [stolpci] * vrstice
+        self.prosta_v_stolpcih = [vrstice] * stolpci
+        self.ocena = vrstice * self.vrednosti_vrstic[stolpci] + stolpci * self.vrednosti_stolpcev[vrstice]
+        self.na_potezi = RDECI
+        self.zgodovina = None # Stanje pred zadnjo potezo, narejeno z naredi_potezo.
+        self.odigrane = [] # Domine, položene z naredi_potezo, po vrsti (za zapis igre).
+
+    @property
+    def plosca(self):
+        """Vrne ploščo kot seznam seznamov, izračunan iz bitnih mask."""
+        plosca = []
+        for i in range(self.vrstice):
+            vrstica = []
+            for j in range(self.stolpci):
+                bit = 1 << (i * self.sirina + j)
+                if self.rdeca & bit:
+                    vrstica.append(RDECI)
+                elif self.modra & bit:
+                    vrstica.append(MODRI)
+                else:
+                    vrstica.append(NEPOKRITO)
+            plosca.append(vrstica)
+        return plosca
+
+    @plosca.setter
+    def plosca(self, plosca):
+        """Nastavi bitne maske iz plošče, podane kot seznam seznamov."""
+        self.rdeca = 0
+        self.modra = 0
+        for i in range(self.vrstice):
+            for j in range(self.stolpci):
+                bit = 1 << (i * self.sirina + j)
+                if plosca[i][j] == RDECI:
+                    self.rdeca |= bit
+                elif plosca[i][j] == MODRI:
+                    self.modra |= bit
+                elif plosca[i][j] != NEPOKRITO:
+                    assert False, "igra: neveljavno polje"
+        self.izracunaj_zobrist()
+        self.izracunaj_oceno()
+
+    def izracunaj_zobrist(self):
+        """Izračuna Zobristove ključe pozicije iz bitnih mask."""
+        self.zobrist = 0
+        zasedena = self.rdeca | self.modra
+        while zasedena:
+            bit = zasedena & -zasedena
+            zasedena ^= bit
+            self.zobrist ^= self.kljuci_polj[bit.bit_length() - 1]
+
+    def izracunaj_oceno(self):
+        """Iz bitnih mask prešteje nepokrita polja v vrsticah in stolpcih ter izračuna oceno pozicije."""
+        prosta = self.prosta()
+        self.prosta_v_vrsticah = [stevilo_bitov(prosta & maska) for maska in self.maske_vrstic]
+        self.prosta_v_stolpcih = [stevilo_bitov(prosta & maska) for maska in self.maske_stolpcev]
+        self.ocena = 0
+        for k in self.prosta_v_vrsticah:
+            self.ocena += self.vrednosti_vrstic[k]
+        for k in self.prosta_v_stolpcih:
+            self.ocena += self.vrednosti_stolpcev[k]
+
+    def prosta(self):
+        """Vrne masko nepokritih polj."""
+        return self.vsa_polja & ~(self.rdeca | self.modra)
+
+    def maske_potez(self):
+        """Vrne masko navpičnih in vodoravnih potez. Bit polja (i,j) je v prvi maski prižgan,
+        če sta prosti polji (i,j) in (i+1,j), v drugi pa, če sta prosti polji (i,j) in (i,j+1)."""
+        prosta = self.prosta()
+        return (prosta & (prosta >> self.sirina), prosta & (prosta >> 1))
+
+    def stevilo_potez(self):
+        """Vrne število mest, kamor je možno položiti domino."""
+        (navpicne, vodoravne) = self.maske_potez()
+        return stevilo_bitov(navpicne) + stevilo_bitov(vodoravne)
+
+    def ocene_naslednikov(self, domine):
+        """Vrne seznam ocen pozicij, ki nastanejo po vsaki od danih domin, ne da bi poteze odigrali.
+        Domina zmanjša število nepokritih polj v dveh vrsticah in dveh stolpcih (ali za 2 v eni vrstici
+        oz. stolpcu), zato je ocena naslednika vsota štirih razlik vrednosti. Pri dovolj naslednikih jih
+        izračunamo naenkrat z NumPy."""
+        if numpy is not None and len(domine) >= NAJMANJ_ZA_NUMPY:
+            (indeksi, crte, odmiki, popravki, vrednosti) = tabele_numpy(self.vrstice, self.stolpci)
+            izbrane = numpy.fromiter(map(indeksi.__getitem__, domine), numpy.intp, len(domine))
+            prosta = numpy.array(self.prosta_v_vrsticah + self.prosta_v_stolpcih, dtype=numpy.intp)
+            # Indeks vrednosti črte s trenutnim številom nepokritih polj (vrstica tabele za vsako polje domine).
+            indeks = odmiki[:, izbrane] + prosta[crte[:, izbrane]] - popravki[:, izbrane]
+            razlike = (vrednosti[indeks - 1] - vrednosti[indeks]).sum(axis=0)
+            return (razlike + self.ocena).tolist()
+        ocene = []
+        vrednosti_vrstic = self.vrednosti_vrstic
+        vrednosti_stolpcev = self.vrednosti_stolpcev
+        vrstice = self.prosta_v_vrsticah
+        stolpci = self.prosta_v_stolpcih
+        for domina in domine:
+            (i1, i2, j1, j2) = self.crte_domin[domina]
+            if i1 == i2: # Vodoravna domina.
+                k = vrstice[i1]
+                ocena = self.ocena + vrednosti_vrstic[k - 2] - vrednosti_vrstic[k]
+                k = stolpci[j1]
+                ocena += vrednosti_stolpcev[k - 1] - vrednosti_stolpcev[k]
+                k = stolpci[j2]
+                ocena += vrednosti_stolpcev[k - 1] - vrednosti_stolpcev[k]
+            else: # Navpična domina.
+                k = stolpci[j1]
+                ocena = self.ocena + vrednosti_stolpcev[k - 2] - vrednosti_stolpcev[k]
+                k = vrstice[i1]
+                ocena += vrednosti_vrstic[k - 1] - vrednosti_vrstic[k]
+                k = vrstice[i2]
+                ocena += vrednosti_vrstic[k - 1] - vrednosti_vrstic[k]
+            ocene.append(ocena)
+        return ocene
+
+    def domina(self, x1, y1, x2, y2):
+        """Vrne masko domine na poljih (x1,y1) in (x2,y2) oz. 0, če polji nista sosednji polji plošče."""
+        if not (0 <= x1 < self.vrstice and 0 <= y1 < self.stolpci and 0 <= x2 < self.vrstice and 0 <= y2 < self.stolpci):
+            return 0
+        if abs(x1 - x2) + abs(y1 - y2) != 1:
+            return 0
+        return (1 << (x1 * self.sirina + y1)) | (1 << (x2 * self.sirina + y2))
+
+    def domine(self):
+        """Vrne seznam mask vseh mest, kamor je možno položiti domino."""
+        (navpicne, vodoravne) = self.maske_potez()
+        domine = []
+        while navpicne:
+            bit = navpicne & -navpicne # Najnižji prižgan bit.
+            navpicne ^= bit
+            domine.append(bit | (bit << self.sirina))
+        while vodoravne:
+            bit = vodoravne & -vodoravne
+            vodoravne ^= bit
+            domine.append(bit | (bit << 1))
+        return domine
+
+    def razlicne_domine(self):
+        """Vrne seznam mask domin brez potez, ki so zaradi simetrije trenutne plošče enakovredne že naštetim."""
+        prosta = self.prosta()
+        simetrije = [simetrija for simetrija in self.simetrije if preslikaj(prosta, simetrija) == prosta]
+        if len(simetrije) == 1: # Plošča ni simetrična.
+            return self.domine()
+        razlicne = []
+        videne = set()
+        for domina in self.domine():
+            predstavnik = min(preslikaj(domina, simetrija) for simetrija in simetrije)
+            if predstavnik not in videne:
+                videne.add(predstavnik)
+                razlicne.append(domina)
+        return razlicne
+
+    def kljuc(self):
+        """Vrne Zobristov ključ kanonične oblike pozicije in indeks simetrije, ki pozicijo preslika vanjo.
+        Kanonična oblika je tista slika pozicije, ki ima najmanjši ključ, zato si zrcalne pozicije delijo ključ."""
+        zobrist = self.zobrist
+        kljuc = zobrist & MASKA_ZOBRIST
+        simetrija = 0
+        for k in range(1, len(self.simetrije)):
+            zobrist >>= BITI_ZOBRIST
+            if zobrist & MASKA_ZOBRIST < kljuc:
+                kljuc = zobrist & MASKA_ZOBRIST
+                simetrija = k
+        return (kljuc, simetrija)
+
+    def normaliziraj_potezo(self, x1, y1, x2, y2):
+        """Vrne potezo, pri kateri je zgornje oz. levo polje domine navedeno prvo."""
+        if (x2, y2) < (x1, y1):
+            return (x2, y2, x1, y1)
+        return (x1, y1, x2, y2)
+
+    def poteza_domine(self, domina):
+        """Vrne potezo (x1, y1, x2, y2), ki ustreza maski domine."""
+        bit = domina & -domina
+        (x1, y1) = divmod(bit.bit_length() - 1, self.sirina)
+        (x2, y2) = divmod((domina ^ bit).bit_length() - 1, self.sirina)
+        return (x1, y1, x2, y2)
+
+    def odigraj(self, domina):
+        """Položi domino za igralca na potezi in preda potezo nasprotniku. Veljavnosti poteze ne preverja."""
+        if self.na_potezi == RDECI:
+            self.rdeca |= domina
+            self.na_potezi = MODRI
+        else:
+            self.modra |= domina
+            self.na_potezi = RDECI
+        self.zobrist ^= self.zobrist_domin[domina]
+        # Domina pokrije po eno polje v dveh vrsticah in dveh stolpcih (vrstica ali stolpec se lahko ponovi).
+        (i1, i2, j1, j2) = self.crte_domin[domina]
+        vrednosti = self.vrednosti_vrstic
+        vrstice = self.prosta_v_vrsticah
+        ocena = self.ocena
+        k = vrstice[i1]
+        ocena += vrednosti[k - 1] - vrednosti[k]
+        vrstice[i1] = k - 1
+        k = vrstice[i2]
+        ocena += vrednosti[k - 1] - vrednosti[k]
+        vrstice[i2] = k - 1
+        vrednosti = self.vrednosti_stolpcev
+        stolpci = self.prosta_v_stolpcih
+        k = stolpci[j1]
+        ocena += vrednosti[k - 1] - vrednosti[k]
+        stolpci[j1] = k - 1
+        k = stolpci[j2]
+        ocena += vrednosti[k - 1] - vrednosti[k]
+        stolpci[j2] = k - 1
+        self.ocena = ocena
+
+    def razveljavi(self, domina):
+        """Odstrani domino, ki jo je z metodo odigraj položil prejšnji igralec, in mu vrne potezo."""
+        if self.na_potezi == RDECI:
+            self.modra ^= domina
+            self.na_potezi = MODRI
+        else:
+            self.rdeca ^= domina
+            self.na_potezi = RDECI
+        self.zobrist ^= self.zobrist_domin[domina]
+        (i1, i2, j1, j2) = self.crte_domin[domina]
+        vrednosti = self.vrednosti_vrstic
+        vrstice = self.prosta_v_vrsticah
+        ocena = self.ocena
+        k = vrstice[i1]
+        ocena += vrednosti[k + 1] - vrednosti[k]
+        vrstice[i1] = k + 1
+        k = vrstice[i2]
+        ocena += vrednosti[k + 1] - vrednosti[k]
+        vrstice[i2] = k + 1
+        vrednosti = self.vrednosti_stolpcev
+        stolpci = self.prosta_v_stolpcih
+        k = stolpci[j1]
+        ocena += vrednosti[k + 1] - vrednosti[k]
+        stolpci[j1] = k + 1
+        k = stolpci[j2]
+        ocena += vrednosti[k + 1] - vrednosti[k]
+        stolpci[j2] = k + 1
+        self.ocena = ocena
+
+    def je_veljavna(self, x1, y1, x2, y2):
+        """Vrne True, če domina na poljih (x1,y1) in (x2,y2) pokrije dve sosednji prosti polji."""
+        domina = self.domina(x1, y1, x2, y2)
+        return domina != 0 and self.prosta() & domina == domina
+
+    def kopija_igre(self):
+        """Vrne kopijo te igre."""
+        k = Igra(self.vrstice, self.stolpci, self.mizerna)
+        k.rdeca = self.rdeca
+        k.modra = self.modra
+        k.zobrist = self.zobrist
+        k.prosta_v_vrsticah = self.prosta_v_vrsticah[:]
+        k.prosta_v_stolpcih = self.prosta_v_stolpcih[:]
+        k.ocena = self.ocena
+        k.na_potezi = self.na_potezi
+        return k
+
+    def zgodovina_igre(self):
+        """Shrani trenutno stanje igre."""
+        self.zgodovina = (self.rdeca, self.modra, self.na_potezi)
+ 
+    def veljavne_poteze(self):
+        """Vrne seznam veljavnih potez. Vsako mesto za domino je našteto le enkrat, z manjšim poljem na prvem mestu."""
+        (navpicne, vodoravne) = self.maske_potez()
+        poteze = navpicne | vodoravne
+        veljavne = []
+        while poteze:
+            bit = poteze & -poteze # Najnižji prižgan bit.
+            poteze ^= bit
+            (i, j) = divmod(bit.bit_length() - 1, self.sirina)
+            if navpicne & bit:
+                veljavne.append((i,j,i+1,j))
+            if vodoravne & bit:
+                veljavne.append((i,j,i,j+1))
+        return veljavne
+
+    def naredi_potezo(self, x1, y1, x2, y2):
+        """Preveri, če je poteza veljavna. Vrne kdo je naredil potezo in stanje po potezi oz. None, če je neveljavna."""
+        if self.je_veljavna(x1, y1, x2, y2):
+            domina = self.domina(x1, y1, x2, y2)
+            self.zgodovina_igre()
+            self.odigrane.append(domina)
+            igralec = self.na_potezi
+            self.odigraj(domina)
+            stanje = self.stanje_igre()
+            if stanje != NI_KONEC and not self.mizerna:
+                self.na_potezi = igralec # Igre je konec, na potezi ostane zmagovalec.
+            return (igralec, stanje)
+        return (self.na_potezi, None) # Poteza ni veljavna.
+
+    def stanje_igre(self):
+        """Preveri stanje igre. Če igre ni konec vrne NI_KONEC dugače KONEC."""
+        (navpicne, vodoravne) = self.maske_potez()
+        if navpicne | vodoravne:
+            return NI_KONEC # Igre ni konec.
+        return KONEC
+
+    
+######################################################################
+## Algoritem
+
+UTEZ = 1000000000
+NESKONCNO = UTEZ + 1
+
+NAJVECJA_VREDNOST_CRTE = UTEZ // 100 # Vrednost vrstice oz. stolpca brez nepokritih polj.
+OSNOVA_VREDNOSTI = 100 # Za koliko se vrednost zmanjša, ko sta v vrstici dve nepokriti polji več.
+_vrednosti = {} # Predpomnilnik vrednosti vrstic in stolpcev za posamezne velikosti plošče.
+
+def vrednosti_crt(dolzina):
+    """Vrne seznam, katerega k-ti element je vrednost vrstice oz. stolpca dane dolžine s k nepokritimi polji.
+    Sodo število nepokritih polj je dobro, liho slabo, vrednost pa pada s številom parov nepokritih polj.
+    Pri daljših črtah osnovo zmanjšamo, da ima tudi prazna črta še neničelno vrednost.
+    Prazna črta sode dolžine je nevtralna."""
+    if dolzina not in _vrednosti:
+        osnova = OSNOVA_VREDNOSTI
+        while osnova > 2 and NAJVECJA_VREDNOST_CRTE // osnova ** (dolzina // 2) == 0:
+            osnova -= 1
+        vrednosti = []
+        for k in range(dolzina + 1):
+            vrednost = NAJVECJA_VREDNOST_CRTE // osnova ** (k // 2)
+            vrednosti.append(vrednost if k % 2 == 0 else -vrednost)
+        if dolzina % 2 == 0:
+            vrednosti[dolzina] = 0
+        _vrednosti[dolzina] = vrednosti
+    return _vrednosti[dolzina]
+
+# Vrste vrednosti v transpozicijski tabeli.
+TOCNO = "tocno"
+SPODNJA_MEJA = "spodnja meja"
+ZGORNJA_MEJA = "zgornja meja"
+
+VELIKOST_TABELE = 1 << 17 # Število zapisov v transpozicijski tabeli.
+
+CAKANJE = 0.02 # Kako pogosto (v sekundah) glavni proces med vzporednim iskanjem preveri prekinitev.
+PERIODA_OBVESTIL = 0.25 # Kako pogosto (v sekundah) med iskanjem obvestimo opazovalce o napredku.
+DELEZ_RESEVANJA = 0.5 # Delež časa, ki ga ima alfa-beta v korenu za točno reševanje (metoda nimberji ima ves čas).
+
+# Metode iskanja.
+MINIMAX = "minimax"
+ALFABETA = "alfabeta"
+NIMBERJI = "nimberji" # Točen izračun, ko je mogoč, sicer alfa-beta.
+MCTS = "mcts" # Iskanje Monte Carlo z naključnimi igrami, za velike plošče.
+
+# Izboljšave alfa-beta, ki jih lahko posamezno izklopimo (npr. za meritve).
+PVS = "pvs" # Iskanje glavne variante: poteze za prvo preverimo z ničelnim oknom.
+MORILCI = "morilci" # Morilske poteze: poteze, ki so na isti višini povzročile rez, poskusimo prej.
+ZGODOVINA = "zgodovina" # Zgodovinska hevristika: ostale poteze uredimo po tem, kako pogosto so povzročile rez.
+ASPIRACIJA = "aspiracija" # Koren preiščemo z oknom okoli vrednosti prejšnje globine.
+PAKETI = "paketi" # Naslednike vozlišča tik pred mejo iskanja ocenimo naenkrat, brez igranja potez.
+IZBOLJSAVE = (PVS, MORILCI, ZGODOVINA, ASPIRACIJA, PAKETI)
+PRIVZETE_IZBOLJSAVE = frozenset((PVS, MORILCI, ZGODOVINA, PAKETI))
+PRVI_PAKET = 4 # Koliko naslednikov vozlišča pred mejo iskanja ocenimo najprej.
+NAJVEC_SOSEDNJIH_DOMIN = 7 # Toliko mest za domino (vključno z njim samim) lahko največ prekriva mesto domine.
+OKNO_ASPIRACIJE = 4 # Polovična širina aspiracijskega okna je četrtina absolutne vrednosti prejšnje globine.
+
+# Težavnosti. Vsaka določa metodo in čas za razmišljanje v sekundah.
+LAHKO = "lahko"
+SREDNJE = "srednje"
+TEZKO = "tezko"
+POPOLNO = "popolno"
+MONTE_CARLO = "monte carlo"
+TEZAVNOSTI = {
+    LAHKO : (MINIMAX, 0.3),
+    SREDNJE : (ALFABETA, 0.5),
+    TEZKO : (ALFABETA, 3.0),
+    POPOLNO : (NIMBERJI, 3.0),
+    MONTE_CARLO : (MCTS, 3.0)
+}
+
+class TranspozicijskaTabela():
+    """Tabela že preiskanih pozicij s fiksnim številom mest. Zapis je (ključ, globina, vrednost, vrsta, poteza, generacija),
+    poteza je shranjena v kanonični obliki pozicije."""
+
+    def __init__(self, velikost=VELIKOST_TABELE):
+        assert velikost & (velikost - 1) == 0, "tabela: velikost mora biti potenca števila 2"
+        self.maska = velikost - 1
+        self.zapisi = [None] * velikost
+        self.generacija = 0 # Poveča se ob vsakem novem iskanju.
+        self.zadetki = 0
+        self.zgresitve = 0
+        self.shranjevanja = 0
+
+    def novo_iskanje(self):
+        """Označi začetek novega iskanja, da se zapisi prejšnjih iskanj prej zamenjajo, in ponastavi števce."""
+        self.generacija += 1
+        self.zadetki = 0
+        self.zgresitve = 0
+        self.shranjevanja = 0
+
+    def poisci(self, kljuc):
+        """Vrne zapis za dani ključ oz. None, če ga v tabeli ni."""
+        zapis = self.zapisi[kljuc & self.maska]
+        if zapis is not None and zapis[0] == kljuc:
+            self.zadetki += 1
+            return zapis
+        self.zgresitve += 1
+        return None
+
+    def shrani(self, kljuc, globina, vrednost, vrsta, poteza):
+        """Shrani zapis. Zapis istega iskanja na tem mestu zamenja le, če je preiskan vsaj tako globoko."""
+        indeks = kljuc & self.maska
+        star = self.zapisi[indeks]
+        if star is None or star[0] == kljuc or star[5] != self.generacija or globina >= star[1]:
+            self.zapisi[indeks] = (kljuc, globina, vrednost, vrsta, poteza, self.generacija)
+            self.shranjevanja += 1
+
+    def statistika(self):
+        """Vrne slovar s številom zadetkov, zgrešitev in shranjevanj."""
+        return {"zadetki": self.zadetki, "zgresitve": self.zgresitve, "shranjevanja": self.shranjevanja}
+
+NAJVEC_POLJ_REGIJE = 20 # Največja regija, ki jo rešitelj preišče med igro.
+
+def kanonicni_kljuc_polj(polja):
+    """Vrne ključ (visina, sirina, maska) regije, podane s seznamom polj (i, j), ki je enak za vse njene
+    premike, zasuke in zrcaljenja. Bit polja (i,j) je v maski i*sirina + j, brez stražnih bitov.
+    Ključ je najmanjši med ključi vseh osmih slik regije, zato slik z večjo višino ne računamo."""
+    i0 = min(i for (i, j) in polja)
+    j0 = min(j for (i, j) in polja)
+    polja = [(i - i0, j - j0) for (i, j) in polja]
+    visina = max(i for (i, j) in polja) + 1
+    sirina = max(j for (i, j) in polja) + 1
+    najmanjsi = None
+    for simetrija in range(8):
+        if simetrija & 1: # Zrcaljenje čez diagonalo zamenja višino in širino.
+            (visina_regije, sirina_regije) = (sirina, visina)
+        else:
+            (visina_regije, sirina_regije) = (visina, sirina)
+        if visina_regije > min(visina, sirina):
+            continue
+        maska = 0
+        for (i, j) in polja:
+            if simetrija & 1:
+                (i, j) = (j, i)
+            if simetrija & 2:
+                i = visina_regije - 1 - i
+            if simetrija & 4:
+                j = sirina_regije - 1 - j
+            maska |= 1 << (i * sirina_regije + j)
+        kljuc = (visina_regije, sirina_regije, maska)
+        if najmanjsi is None or kljuc < najmanjsi:
+            najmanjsi = kljuc
+    return najmanjsi
+
+def regija_kljuca(kljuc):
+    """Vrne (regija, sirina): masko regije s kanoničnim ključem na plošči s stražnimi biti in širino vrstice."""
+    (visina_regije, sirina_regije, maska) = kljuc
+    sirina = sirina_regije + 1
+    regija = 0
+    for i in range(visina_regije):
+        vrstica = (maska >> (i * sirina_regije)) & ((1 << sirina_regije) - 1)
+        regija |= vrstica << (i * sirina)
+    return (regija, sirina)
+
+class PrekinjenoResevanje(Exception):
+    """Rešitelj je bil prekinjen, preden je izračunal nimber."""
+
+class Resevalec():
+    """Točen rešitelj normalne igre. Ko domine razdelijo prosta polja na nepovezane regije, je igra vsota
+    nepristranskih iger, zato je njen nimber (Sprague-Grundyjevo število) XOR nimberjev regij."""
+
+    def __init__(self, baza=None):
+        self.nimberji = {} # Kanonični ključ regije -> nimber.
+        self.surovi = {} # Širina plošče -> {maska regije -> nimber}, da ključa ne računamo vedno znova.
+        self.baza = baza # Baza nimberjev na disku ali None.
+
+    def regije(self, prosta, sirina):
+        """Vrne seznam povezanih komponent prostih polj, na katere je mogoče položiti vsaj eno domino."""
+        regije = []
+        while prosta:
+            regija = prosta & -prosta
+            while True: # Regijo širimo na sosednja prosta polja.
+                vecja = (regija | (regija << 1) | (regija >> 1) | (regija << sirina) | (regija >> sirina)) & prosta
+                if vecja == regija:
+                    break
+                regija = vecja
+            prosta ^= regija
+            if regija & (regija >> 1) or regija & (regija >> sirina):
+                regije.append(regija)
+        return regije
+
+    def kanonicni_kljuc(self, regija, sirina):
+        """Vrne kanonični ključ regije na plošči z dano širino vrstice."""
+        polja = []
+        while regija:
+            bit = regija & -regija
+            regija ^= bit
+            polja.append(divmod(bit.bit_length() - 1, sirina))
+        return kanonicni_kljuc_polj(polja)
+
+    def nimber_kljuca(self, kljuc):
+        """Vrne nimber regije, podane s kanoničnim ključem."""
+        return self.nimber(*regija_kljuca(kljuc))
+
+    def domine_regije(self, regija, sirina):
+        """Vrne seznam mask domin, ki jih je mogoče položiti v regijo."""
+        domine = []
+        for (poteze, zamik) in ((regija & (regija >> sirina), sirina), (regija & (regija >> 1), 1)):
+            while poteze:
+                bit = poteze & -poteze
+                poteze ^= bit
+                domine.append(bit | (bit << zamik))
+        return domine
+
+    def nimber(self, regija, sirina, prekinitev=None):
+        """Vrne nimber povezane regije prostih polj na plošči z dano širino vrstice. Prekinitev je funkcija,
+        ki vrne True, ko naj rešitelj neha računati, ali None."""
+        surovi = self.surovi.setdefault(sirina, {})
+        if regija in surovi:
+            return surovi[regija]
+        kljuc = self.kanonicni_kljuc(regija, sirina)
+        if kljuc not in self.nimberji and self.baza is not None:
+            nimber = self.baza.poisci(kljuc)
+            if nimber is not None:
+                self.nimberji[kljuc] = nimber
+        if kljuc not in self.nimberji:
+            # Preverjamo le, ko nimber računamo na novo; v slovarje pridejo samo dokončani nimberji.
+            if prekinitev is not None and prekinitev():
+                raise PrekinjenoResevanje()
+            nasledniki = set()
+            for domina in self.domine_regije(regija, sirina):
+                nasledniki.add(self.vrednost(regija ^ domina, sirina, prekinitev))
+            nimber = 0
+            while nimber in nasledniki: # Najmanjše število, ki ga ni med nasledniki.
+                nimber += 1
+            self.nimberji[kljuc] = nimber
+        surovi[regija] = self.nimberji[kljuc]
+        return surovi[regija]
+
+    def vrednost(self, prosta, sirina, prekinitev=None):
+        """Vrne nimber pozicije z danimi prostimi polji. Igralec na potezi zmaga natanko tedaj, ko ni 0."""
+        vrednost = 0
+        for regija in self.regije(prosta, sirina):
+            vrednost ^= self.nimber(regija, sirina, prekinitev)
+        return vrednost
+
+    def je_resljiva(self, igra):
+        """Vrne True, če je vsaka regija prostih polj v bazi ali ni večja od NAJVEC_POLJ_REGIJE."""
+        for regija in self.regije(igra.prosta(), igra.sirina):
+            if stevilo_bitov(regija) > NAJVEC_POLJ_REGIJE:
+                if self.baza is None or self.baza.poisci(self.kanonicni_kljuc(regija, igra.sirina)) is None:
+                    return False
+        return True
+
+    def zmagovalna_poteza(self, igra, prekinitev=None):
+        """Vrne domino, po kateri je nimber pozicije 0, oz. None, če je pozicija izgubljena."""
+        regije = self.regije(igra.prosta(), igra.sirina)
+        nimberji = [self.nimber(regija, igra.sirina, prekinitev) for regija in regije]
+        skupaj = 0
+        for nimber in nimberji:
+            skupaj ^= nimber
+        if skupaj == 0:
+            return None
+        for (regija, nimber) in zip(regije, nimberji):
+            cilj = skupaj ^ nimber # Nimber, ki ga mora imeti regija po potezi.
+            if cilj >= nimber:
+                continue # Vsak manjši nimber je zagotovo dosegljiv, večji pa morda ne.
+            for domina in self.domine_regije(regija, igra.sirina):
+                if self.vrednost(regija ^ domina, igra.sirina, prekinitev) == cilj:
+                    return domina
+        assert False, "resevalec: zmagovalne poteze ni"
+
+NAJVEC_POLJ_MIZERNE = 26 # Največje število prostih polj v regijah, pri katerem mizerno igro rešimo točno.
+NAJVEC_IZIDOV = 1 << 21 # Ko mizerni rešitelj pozna toliko pozicij, jih pozabi.
+NAJVEC_POLJ_HROMADE = 8 # Večje regije praktično niso nikoli enake nim hromadi, zato jih ne preverjamo.
+
+def hromada(velikost):
+    """Vrne ključ, s katerim mizerni rešitelj označi regijo, ki je enaka nim hromadi dane velikosti.
+    Regije imajo višino vsaj 1, zato se ključi hromad ne morejo ujemati s ključi regij."""
+    return (0, 0, velikost)
+
+class MizerniResevalec(Resevalec):
+    """Točen rešitelj mizerne igre. Vsota regij se ne da oceniti z nimberji, zato rešitelj preiskuje
+    pozicije, predstavljene z urejenim seznamom kanoničnih ključev regij, in si zapomni njihove izide.
+    Pozicijo pred iskanjem skrajša: regijo, katere igra je enaka nim hromadi, zamenja s hromado, dve
+    hromadi velikosti 1 odstrani (igralec, ki vzame eno, nasprotniku pusti drugo, zato se izid ne spremeni),
+    pozicijo iz samih hromad pa oceni s pravilom mizernega nima."""
+
+    def __init__(self, baza=None):
+        super().__init__(baza)
+        self.izidi = {} # Ključ pozicije -> True, če igralec na potezi zmaga.
+        self.nasledniki = {} # Ključ regije -> seznam različnih ključev pozicij, ki nastanejo iz regije po potezi.
+        self.hromade = {} # Ključ regije -> velikost hromade, ki ji je regija enaka, ali None.
+        self.kljuci = {} # (sirina, maska regije) -> kanonični ključ regije.
+        self.pozicije = 0 # Število pozicij, ki jih je rešitelj preiskal.
+
+    def kljuc_regije(self, regija, sirina):
+        """Vrne kanonični ključ regije. Ključe si zapomni, ker jih rešitelj potrebuje pri vsaki potezi."""
+        if (sirina, regija) not in self.kljuci:
+            self.kljuci[(sirina, regija)] = self.kanonicni_kljuc(regija, sirina)
+        return self.kljuci[(sirina, regija)]
+
+    def kljuci_regij(self, prosta, sirina):
+        """Vrne seznam kanoničnih ključev regij prostih polj, na katere je mogoče položiti domino."""
+        return [self.kljuc_regije(regija, sirina) for regija in self.regije(prosta, sirina)]
+
+    def nasledniki_regije(self, kljuc):
+        """Vrne seznam ključev pozicij, ki jih lahko iz regije (ali hromade) dobimo z eno potezo. Poteze,
+        ki zaradi simetrije regije vodijo v isto pozicijo, so naštete le enkrat."""
+        if kljuc not in self.nasledniki:
+            if kljuc[0] == 0: # Hromada ima za naslednike vse manjše hromade.
+                self.nasledniki[kljuc] = [()] + [(hromada(velikost),) for velikost in range(1, kljuc[2])]
+            else:
+                (regija, sirina) = regija_kljuca(kljuc)
+                razlicni = set()
+                for domina in self.domine_regije(regija, sirina):
+                    razlicni.add(tuple(sorted(self.kljuci_regij(regija ^ domina, sirina))))
+                self.nasledniki[kljuc] = sorted(razlicni, key=len)
+        return self.nasledniki[kljuc]
+
+    def velikost_hromade(self, kljuc):
+        """Vrne n, če je igra regije enaka nim hromadi *n, sicer None. To velja natanko tedaj, ko vsaka
+        poteza vodi v eno samo regijo, ki je hromada, ali v prazno pozicijo, in so velikosti teh hromad
+        ravno 0, 1, ..., n-1. Regij z več kot NAJVEC_POLJ_HROMADE polji ne preverja in zanje vrne None."""
+        if kljuc not in self.hromade:
+            if kljuc[0] != 0 and stevilo_bitov(kljuc[2]) > NAJVEC_POLJ_HROMADE:
+                self.hromade[kljuc] = None
+                return None
+            velikosti = set()
+            for naslednik in self.nasledniki_regije(kljuc):
+                if len(naslednik) > 1:
+                    velikosti = None
+                    break
+                velikost = self.velikost_hromade(naslednik[0]) if naslednik else 0
+                if velikost is None:
+                    velikosti = None
+                    break
+                velikosti.add(velikost)
+            if velikosti is not None and velikosti == set(range(len(velikosti))):
+                self.hromade[kljuc] = len(velikosti)
+            else:
+                self.hromade[kljuc] = None
+        return self.hromade[kljuc]
+
+    def skrajsaj(self, kljuci):
+        """Vrne (ključ skrajšane pozicije, izid). Izid je True ali False, če ga pozna že iz hromad, sicer None."""
+        regije = []
+        hromade = []
+        for kljuc in kljuci:
+            velikost = self.velikost_hromade(kljuc)
+            if velikost is None:
+                regije.append(kljuc)
+            else:
+                hromade.append(velikost)
+        enice = hromade.count(1) % 2 # Pari hromad velikosti 1 se izničijo.
+        vecje = [velikost for velikost in hromade if velikost > 1]
+        if not regije: # Mizerni nim.
+            if not vecje:
+                return ((), enice == 0) # Igralec na potezi zmaga, če ostane sodo mnogo enic.
+            vsota = enice
+            for velikost in vecje:
+                vsota ^= velikost
+            return ((), vsota != 0)
+        regije.extend(hromada(velikost) for velikost in vecje)
+        if enice:
+            regije.append(hromada(1))
+        regije.sort()
+        return (tuple(regije), None)
+
+    def zmaga(self, kljuci, prekinitev=None):
+        """Vrne True, če igralec na potezi v poziciji iz regij z danimi ključi zmaga."""
+        (kljuc, izid) = self.skrajsaj(kljuci)
+        if izid is not None:
+            return izid
+        if kljuc in self.izidi:
+            return self.izidi[kljuc]
+        if prekinitev is not None and prekinitev():
+            raise PrekinjenoResevanje()
+        self.pozicije += 1
+        izid = False
+        for (indeks, kljuc_regije) in enumerate(kljuc):
+            if indeks > 0 and kljuc[indeks - 1] == kljuc_regije:
+                continue # Poteze v enaki regiji smo že preiskali.
+            ostale = kljuc[:indeks] + kljuc[indeks + 1:]
+            for naslednik in self.nasledniki_regije(kljuc_regije):
+                if not self.zmaga(ostale + naslednik, prekinitev):
+                    izid = True
+                    break
+            if izid:
+                break
+        if len(self.izidi) >= NAJVEC_IZIDOV:
+            self.izidi.clear()
+        self.izidi[kljuc] = izid
+        return izid
+
+    def je_resljiva(self, igra):
+        """Vrne True, če je v regijah, na katere je mogoče položiti domino, največ NAJVEC_POLJ_MIZERNE polj."""
+        return sum(stevilo_bitov(regija) for regija in self.regije(igra.prosta(), igra.sirina)) <= NAJVEC_POLJ_MIZERNE
+
+    def zmagovalna_poteza(self, igra, prekinitev=None):
+        """Vrne domino, po kateri nasprotnik izgubi, oz. None, če je pozicija izgubljena."""
+        regije = self.regije(igra.prosta(), igra.sirina)
+        kljuci = [self.kljuc_regije(regija, igra.sirina) for regija in regije]
+        for (indeks, regija) in enumerate(regije):
+            ostale = kljuci[:indeks] + kljuci[indeks + 1:]
+            for domina in self.domine_regije(regija, igra.sirina):
+                if not self.zmaga(ostale + self.kljuci_regij(regija ^ domina, igra.sirina), prekinitev):
+                    return domina
+        return None
+
+# Iskanje Monte Carlo.
+KONSTANTA_UCT = 0.7 # Utež raziskovanja v formuli UCT.
+NAJVEC_VOZLISC_DREVESA = 1 << 20 # Ko je drevo tako veliko, ga ne širimo več, igramo le še naključne igre.
+STEVILO_PERMUTACIJ = 64 # Število naključnih vrstnih redov domin, iz katerih izbiramo naključne igre.
+
+class VozlisceMCTS():
+    """Vozlišče drevesa Monte Carlo. Zmage so zmage igralca, ki je domino položil, torej igralca, ki v
+    tem vozlišču ni na potezi."""
+    __slots__ = ("domina", "otroci", "neraziskane", "obiski", "zmage", "delez", "negotovost")
+
+    def __init__(self, domina):
+        self.domina = domina # Domina, s katero pridemo v vozlišče (v korenu None).
+        self.otroci = []
+        self.neraziskane = None # Domine, ki jih še nismo dodali med otroke. Izračunamo jih ob drugem obisku.
+        self.obiski = 0
+        self.zmage = 0
+        # Delež zmag in 1/sqrt(obiski) posodobimo ob vsakem obisku, da je izbira otroka hitrejša.
+        self.delez = 0.0
+        self.negotovost = 1.0
+
+class DrevoMCTS():
+    """Drevo iskanja Monte Carlo (UCT). Pozicijo predstavlja le maska pokritih polj, saj barva domin na
+    izid ne vpliva. Drevo ostane med potezami: ob novem iskanju za koren vzame poddrevo trenutne pozicije."""
+
+    def __init__(self, seme=None):
+        self.generator = random.Random(seme)
+        self.koren = None
+        self.zasedena = None # Pokrita polja v korenu.
+        self.velikost = None
+        self.domine = [] # Vse domine na plošči.
+        self.permutacije = [] # Naključni vrstni redi vseh domin za naključne igre.
+        self.mizerna = False # Pravila igre, za katero je drevo zgrajeno.
+        self.vozlisca = 0 # Število vozlišč v drevesu.
+        self.igre = 0 # Število odigranih naključnih iger.
+
+    def pripravi(self, igra):
+        """Za koren nastavi trenutno pozicijo igre. Če je potomec prejšnjega korena, obdrži njegovo poddrevo."""
+        zasedena = igra.rdeca | igra.modra
+        if self.velikost != igra.velikost:
+            self.velikost = igra.velikost
+            self.domine = list(igra.crte_domin)
+            self.permutacije = []
+            for k in range(STEVILO_PERMUTACIJ):
+                permutacija = self.domine[:]
+                self.generator.shuffle(permutacija)
+                self.permutacije.append(permutacija)
+            self.koren = None
+        if self.mizerna != igra.mizerna: # Statistika drugih pravil ni uporabna.
+            self.mizerna = igra.mizerna
+            self.koren = None
+        vozlisce = None
+        if self.koren is not None and self.zasedena & zasedena == self.zasedena:
+            vozlisce = self.koren
+            odigrane = zasedena ^ self.zasedena
+            while odigrane and vozlisce is not None:
+                for otrok in vozlisce.otroci:
+                    if otrok.domina & odigrane == otrok.domina:
+                        odigrane ^= otrok.domina
+                        vozlisce = otrok
+                        break
+                else:
+                    vozlisce = None
+        if vozlisce is not None:
+            # Zavržene veje ne štejejo več, zato vozlišča poddrevesa preštejemo znova.
+            self.vozlisca = self.prestej(vozlisce)
+            if self.vozlisca >= NAJVEC_VOZLISC_DREVESA: # Polnega drevesa ne bi mogli več širiti.
+                vozlisce = None
+        if vozlisce is None:
+            vozlisce = VozlisceMCTS(None)
+            vozlisce.neraziskane = igra.razlicne_domine() # V korenu izpustimo simetrične poteze.
+            self.vozlisca = 1
+        self.koren = vozlisce
+        self.zasedena = zasedena
+
+    def prestej(self, vozlisce):
+        """Vrne število vozlišč v poddrevesu vozlišča."""
+        stevilo = 0
+        sklad = [vozlisce]
+        while sklad:
+            vozlisce = sklad.pop()
+            stevilo += 1
+            sklad.extend(vozlisce.otroci)
+        return stevilo
+
+    def proste_domine(self, zasedena):
+        """Vrne seznam domin, ki jih je mogoče položiti."""
+        return [domina for domina in self.domine if not domina & zasedena]
+
+    def nakljucna_igra(self, zasedena):
+        """Odigra naključno igro in vrne število potez. Položiti prvo domino naključnega vrstnega reda,
+        ki je še prosta, je isto kot izbrati naključno med vsemi možnimi potezami."""
+        permutacija = self.permutacije[self.generator.randrange(STEVILO_PERMUTACIJ)]
+        zamik = self.generator.randrange(len(permutacija))
+        poteze = 0
+        for domina in permutacija[zamik:]:
+            if not domina & zasedena:
+                zasedena |= domina
+                poteze += 1
+        for domina in permutacija[:zamik]:
+            if not domina & zasedena:
+                zasedena |= domina
+                poteze += 1
+        self.igre += 1
+        if self.igre % STEVILO_PERMUTACIJ == 0: # Vrstne rede sproti obnavljamo.
+            self.generator.shuffle(permutacija)
+        return poteze
+
+    def iteracija(self):
+        """Izbere list z UCT, ga razširi, odigra naključno igro in rezultat zapiše na pot do korena."""
+        vozlisce = self.koren
+        zasedena = self.zasedena
+        pot = [vozlisce]
+        while True:
+            if vozlisce.neraziskane is None:
+                vozlisce.neraziskane = self.proste_domine(zasedena)
+            if vozlisce.neraziskane or not vozlisce.otroci:
+                break
+            utez = KONSTANTA_UCT * math.sqrt(math.log(vozlisce.obiski))
+            naj_vrednost = -1.0
+            for otrok in vozlisce.otroci:
+                vrednost = otrok.delez + utez * otrok.negotovost
+                if vrednost > naj_vrednost:
+                    naj_vrednost = vrednost
+                    najboljsi = otrok
+            vozlisce = najboljsi
+            zasedena |= vozlisce.domina
+            pot.append(vozlisce)
+        if vozlisce.neraziskane and (self.vozlisca < NAJVEC_VOZLISC_DREVESA or vozlisce is self.koren):
+            neraziskane = vozlisce.neraziskane
+            k = self.generator.randrange(len(neraziskane))
+            (neraziskane[k], neraziskane[-1]) = (neraziskane[-1], neraziskane[k])
+            domina = neraziskane.pop()
+            zasedena |= domina
+            otrok = VozlisceMCTS(domina)
+            vozlisce.otroci.append(otrok)
+            self.vozlisca += 1
+            pot.append(otrok)
+        # Igralec, ki je prišel v list, zmaga, če je naključna igra iz lista imela sodo mnogo potez
+        # (v mizerni igri liho).
+        zmaga = (self.nakljucna_igra(zasedena) % 2 == 0) != self.mizerna
+        for vozlisce in reversed(pot):
+            vozlisce.obiski += 1
+            vozlisce.zmage += zmaga
+            vozlisce.delez = vozlisce.zmage / vozlisce.obiski
+            vozlisce.negotovost = vozlisce.obiski ** -0.5
+            zmaga = not zmaga
+
+    def statistika_korena(self):
+        """Vrne slovar domina -> (obiski, zmage) za poteze v korenu."""
+        return {otrok.domina: (otrok.obiski, otrok.zmage) for otrok in self.koren.otroci}
+
+    def glavna_varianta(self):
+        """Vrne zaporedje najpogosteje obiskanih potez od korena naprej."""
+        varianta = []
+        vozlisce = self.koren
+        while vozlisce.otroci:
+            vozlisce = max(vozlisce.otroci, key=lambda otrok: otrok.obiski)
+            varianta.append(vozlisce.domina)
+        return varianta
+
+class Algoritem():
+
+    def __init__(self, igra, tabela=None, resevalec=None, iskalec=None, drevo=None):
+        self.igra = igra
+        self.tabela = tabela # Transpozicijska tabela ali None.
+        self.resevalec = resevalec # Točen rešitelj ali None.
+        self.iskalec = iskalec # Skupina procesov za vzporedno iskanje ali None.
+        self.drevo = drevo # Drevo Monte Carlo, ki ostane med potezami, ali None.
+        self.poteza = None # Sem zapišemo potezo.
+        self.prekini = False # Je igra prekinjena?
+        self.prekinitev = None # Zastavica, s katero glavni proces prekine delavca, ali None.
+        self.rok = float("inf") # Čas, ko moramo nehati iskati.
+        self.premisljuje = False # Premišljevanje med potezo nasprotnika: rok ne velja, dokler ga ne izklopimo.
+        self.izboljsave = PRIVZETE_IZBOLJSAVE # Vklopljene izboljšave alfa-beta.
+        self.morilci = [] # Dve morilski poteze za vsako višino.
+        self.zgodovina_rezov = {} # Domina -> vsota kvadratov globin, na katerih je povzročila rez.
+        self.najvec_vozlisc = None
+        self.vozlisca = 0 # Število obiskanih vozlišč.
+        self.globina = 0 # Zadnja dokončana globina.
+        self.vrednost = None # Vrednost zadnje dokončane globine.
+        self.casi_globin = [] # Čas od začetka iskanja do konca vsake dokončane globine.
+        self.vozlisca_globin = [] # Število vozlišč od začetka iskanja do konca vsake dokončane globine.
+        self.listi = 0 # Število statičnih ocen pozicije.
+        self.rezi = [] # Število rezov alfa-beta na vsaki višini.
+        self.zacetek = time.perf_counter() # Začetek zadnjega iskanja.
+        self.metoda = None # Metoda zadnjega iskanja.
+        self.opazovalci = [] # Funkcije, ki jih med iskanjem kličemo s statistiko iskanja.
+        self.naslednje_obvestilo = float("inf") # Čas, ko opazovalce naslednjič obvestimo o napredku.
+        # Glavna varianta: self.varianta[k] je najboljše nadaljevanje od višine k dalje.
+        self.zasedena_v_korenu = stevilo_bitov(igra.rdeca | igra.modra)
+        self.varianta = [[] for k in range(stevilo_bitov(igra.prosta()) // 2 + 2)]
+        self.prejsnja_varianta = []
+
+    def izracunaj_potezo(self, tezavnost):
+        """Izračuna najboljšo potezo za trenutno stanje igre po metodi in v času, ki ju določa težavnost."""
+        self.poteza = None
+        (metoda, cas) = TEZAVNOSTI[tezavnost]
+        self.poteza = self.igra.poteza_domine(self.isci(metoda, cas))
+
+    def isci(self, metoda, cas):
+        """Z dano metodo v danem času (v sekundah) poišče potezo in vrne masko domine.
+        Na koncu opazovalce obvesti s statistiko celotnega iskanja."""
+        self.metoda = metoda
+        self.pripravi_iskanje(cas)
+        domina = None
+        if metoda == NIMBERJI:
+            domina = self.resi()
+            metoda = ALFABETA # Če zmagovalne poteze ni, iščemo z alfa-beta, a le v preostalem času.
+            cas = max(0.0, self.rok - time.perf_counter())
+        elif metoda == ALFABETA and self.resevalec is not None:
+            # Tudi alfa-beta v korenu najprej poskusi rešitelja (in bazo nimberjev), a mu da le polovico časa.
+            domina = self.resi(self.zacetek + DELEZ_RESEVANJA * cas)
+            cas = max(0.0, self.rok - time.perf_counter())
+        if metoda == MCTS:
+            if self.iskalec is not None:
+                with self.iskalec.zaklep:
+                    domina = self.vzporedni_monte_carlo(cas)
+            else:
+                domina = self.monte_carlo(cas)
+            if domina is None: # Koren nima otrok, ker je bilo iskanje prekinjeno pred prvo iteracijo.
+                domina = self.igra.domine()[0]
+        if domina is None and self.iskalec is not None and metoda == ALFABETA:
+            with self.iskalec.zaklep: # Prekinjeno prejšnje iskanje mora najprej pobrati svoje naloge.
+                domina = self.vzporedno_poglabljanje(cas)
+        if domina is None:
+            domina = self.iterativno_poglabljanje(metoda, cas)
+        self.obvesti(domina)
+        return domina
+
+    def resi(self, rok=None):
+        """Če so vse regije prostih polj dovolj majhne, jih točno reši in vrne zmagovalno potezo.
+        Vrne None, če je pozicija prevelika ali izgubljena oz. če rešitelju zmanjka časa (do roka,
+        privzeto do konca iskanja)."""
+        if rok is None:
+            rok = self.rok
+        if self.resevalec is None:
+            self.resevalec = MizerniResevalec() if self.igra.mizerna else Resevalec(nalozi_bazo())
+        assert isinstance(self.resevalec, MizerniResevalec) == self.igra.mizerna, "algoritem: rešitelj za napačna pravila"
+        if not self.resevalec.je_resljiva(self.igra):
+            return None
+        # Prekinitev podamo kot argument, da je ne more prevzeti drugo iskanje z istim rešiteljem.
+        prekinitev = lambda: (self.prekini is True or (time.perf_counter() > rok and not self.premisljuje)
+                              or (self.prekinitev is not None and self.prekinitev.is_set()))
+        try:
+            domina = self.resevalec.zmagovalna_poteza(self.igra, prekinitev)
+        except PrekinjenoResevanje:
+            return None
+        if domina is not None:
+            self.vrednost = UTEZ
+        return domina
+
+    def pripravi_iskanje(self, cas, najvec_vozlisc=None):
+        """Nastavi omejitve in ponastavi števce ter glavno varianto pred novim iskanjem."""
+        self.zacetek = time.perf_counter()
+        self.rok = self.zacetek + cas
+        self.globina = 0
+        self.vrednost = None
+        self.najvec_vozlisc = najvec_vozlisc
+        self.vozlisca = 0
+        self.listi = 0
+        self.casi_globin = []
+        self.vozlisca_globin = []
+        self.naslednje_obvestilo = self.zacetek + PERIODA_OBVESTIL
+        self.zasedena_v_korenu = stevilo_bitov(self.igra.rdeca | self.igra.modra)
+        self.varianta = [[] for k in range(stevilo_bitov(self.igra.prosta()) // 2 + 2)]
+        self.rezi = [0] * len(self.varianta)
+        self.morilci = [[None, None] for k in self.varianta]
+        self.zgodovina_rezov = dict.fromkeys(self.igra.crte_domin, 0)
+        self.prejsnja_varianta = []
+
+    def iterativno_poglabljanje(self, metoda, cas, najvec_vozlisc=None, najvecja_globina=None):
+        """Z izbrano metodo išče vedno globlje, dokler ne zmanjka časa (v sekundah) ali vozlišč
+        oz. ne doseže največje globine. Vrne najboljšo potezo zadnje dokončane globine."""
+        self.pripravi_iskanje(cas, najvec_vozlisc)
+        if self.tabela is not None:
+            self.tabela.novo_iskanje()
+        if najvecja_globina is None:
+            najvecja_globina = stevilo_bitov(self.igra.prosta()) // 2
+        naj_poteza = None
+        for globina in range(1, najvecja_globina + 1):
+            if metoda == MINIMAX:
+                (poteza, vrednost) = self.minimax(globina, True, koren=True)
+            elif metoda == ALFABETA:
+                (poteza, vrednost) = self.aspiracijsko_iskanje(globina)
+            else:
+                assert False, "algoritem: prepovedana metoda"
+            if self.prekini is True: # Globina ni bila dokončana.
+                break
+            naj_poteza = poteza
+            self.globina = globina
+            self.vrednost = vrednost
+            self.prejsnja_varianta = self.varianta[0]
+            self.koncaj_globino()
+            if abs(vrednost) >= UTEZ: # Izid igre je znan.
+                break
+        if naj_poteza is None: # Niti prva globina ni bila dokončana.
+            naj_poteza = self.igra.domine()[0]
+        return naj_poteza
+
+    def aspiracijsko_iskanje(self, globina):
+        """Alfa-beta v korenu. Z vklopljeno aspiracijo najprej išče v oknu okoli vrednosti prejšnje
+        globine in s polnim oknom ponovi le, če vrednost pade iz okna."""
+        if ASPIRACIJA in self.izboljsave and self.vrednost is not None and abs(self.vrednost) < UTEZ:
+            okno = max(1, abs(self.vrednost) // OKNO_ASPIRACIJE)
+            (alfa, beta) = (self.vrednost - okno, self.vrednost + okno)
+            (poteza, vrednost) = self.alfabeta(globina, alfa, beta, True, koren=True)
+            if alfa < vrednost < beta or self.prekini is True:
+                return (poteza, vrednost)
+        return self.alfabeta(globina, -NESKONCNO, NESKONCNO, True, koren=True)
+
+    def preveri_omejitve(self):
+        """Prekine iskanje, če je zmanjkalo časa ali vozlišč oz. če je glavni proces prekinil delavce.
+        Občasno obvesti opazovalce o napredku."""
+        cas = time.perf_counter()
+        if cas > self.rok and not self.premisljuje:
+            self.prekini = True
+        elif self.najvec_vozlisc is not None and self.vozlisca >= self.najvec_vozlisc:
+            self.prekini = True
+        elif self.prekinitev is not None and self.prekinitev.is_set():
+            self.prekini = True
+        if self.opazovalci and cas >= self.naslednje_obvestilo:
+            self.obvesti()
+
+    def koncaj_globino(self):
+        """Zabeleži čas in število vozlišč ob koncu globine ter obvesti opazovalce."""
+        self.casi_globin.append(time.perf_counter() - self.zacetek)
+        self.vozlisca_globin.append(self.vozlisca)
+        if self.opazovalci:
+            self.obvesti()
+
+    def obvesti(self, domina=None):
+        """Pokliče opazovalce s statistiko iskanja. Domina je izbrana poteza, ko je iskanje končano."""
+        if self.opazovalci:
+            statistika = self.statistika(domina)
+            for opazovalec in self.opazovalci:
+                opazovalec(statistika)
+        self.naslednje_obvestilo = time.perf_counter() + PERIODA_OBVESTIL
+
+    def statistika(self, domina=None):
+        """Vrne slovar s statistiko zadnjega iskanja, ki ga lahko zapišemo v JSON. Efektivni faktor
+        razvejanosti je razmerje med številom vozlišč zadnje in predzadnje dokončane globine."""
+        cas = time.perf_counter() - self.zacetek
+        vozlisca_po_globinah = [b - a for (a, b) in zip([0] + self.vozlisca_globin, self.vozlisca_globin)]
+        if len(vozlisca_po_globinah) >= 2 and vozlisca_po_globinah[-2] > 0:
+            faktor_razvejanosti = vozlisca_po_globinah[-1] / vozlisca_po_globinah[-2]
+        else:
+            faktor_razvejanosti = None
+        rezi = self.rezi[:]
+        while rezi and rezi[-1] == 0:
+            rezi.pop()
+        statistika = {
+            "metoda": self.metoda,
+            "velikost": self.igra.velikost,
+            "prosta_polja": stevilo_bitov(self.igra.prosta()),
+            "koncano": domina is not None,
+            "poteza": self.igra.poteza_domine(domina) if domina is not None else None,
+            "globina": self.globina,
+            "vrednost": self.vrednost,
+            "varianta": [self.igra.poteza_domine(poteza) for poteza in self.prejsnja_varianta],
+            "cas": cas,
+            "vozlisca": self.vozlisca,
+            "vozlisca/s": self.vozlisca / cas if cas > 0 else 0.0,
+            "listi": self.listi,
+            "rezi_po_visinah": rezi,
+            "vozlisca_po_globinah": vozlisca_po_globinah,
+            "casi_globin": self.casi_globin,
+            "faktor_razvejanosti": faktor_razvejanosti
+        }
+        if self.tabela is not None:
+            poizvedbe = self.tabela.zadetki + self.tabela.zgresitve
+            statistika["tabela"] = dict(self.tabela.statistika(), delez_zadetkov=self.tabela.zadetki / poizvedbe if poizvedbe else 0.0)
+        if self.resevalec is not None and self.resevalec.baza is not None:
+            statistika["baza_zadetki"] = self.resevalec.baza.zadetki
+        return statistika
+
+    def uredi_poteze(self, domine, visina, tabelna_poteza=None, hevristike=False):
+        """Na začetek seznama premakne potezo glavne variante prejšnje globine in potezo iz tabele.
+        S hevristikami pred njiju uredi še ostale poteze: najprej morilske, nato po zgodovini rezov."""
+        if hevristike:
+            if ZGODOVINA in self.izboljsave:
+                domine.sort(key=self.zgodovina_rezov.__getitem__, reverse=True)
+            if MORILCI in self.izboljsave:
+                for morilec in reversed(self.morilci[visina]):
+                    if morilec in domine:
+                        domine.remove(morilec)
+                        domine.insert(0, morilec)
+        if visina < len(self.prejsnja_varianta):
+            poteza_variante = self.prejsnja_varianta[visina]
+            if poteza_variante in domine:
+                domine.remove(poteza_variante)
+                domine.insert(0, poteza_variante)
+        if tabelna_poteza in domine:
+            domine.remove(tabelna_poteza)
+            domine.insert(0, tabelna_poteza)
+
+    def zabelezi_rez(self, domina, visina, globina):
+        """Domina je na dani višini in preostali globini povzročila rez."""
+        if MORILCI in self.izboljsave:
+            morilci = self.morilci[visina]
+            if morilci[0] != domina:
+                morilci[1] = morilci[0]
+                morilci[0] = domina
+        if ZGODOVINA in self.izboljsave:
+            self.zgodovina_rezov[domina] += globina * globina
+
+    def vrednosti_naslednikov(self, domine):
+        """Vrne seznam vrednosti igre po vsaki od danih domin, enakih kot vrednost_igre() po odigrani potezi."""
+        if self.igra.mizerna:
+            return [0] * len(domine)
+        return self.igra.ocene_naslednikov(domine)
+
+    def vrednost_igre(self):
+        """Vrne vsoto vrednosti vseh vrstic/stolpcev na plošči, ki jo igra sproti posodablja. Vrednosti
+        vrstic opisujejo parnost normalne igre in v mizerni igri (ne naravnost ne obrnjene) ne pomagajo,
+        zato je tam ocena 0 in iskanje loči le dobljene in izgubljene pozicije."""
+        if self.igra.mizerna:
+            return 0
+        return self.igra.ocena
+
+##############################################
+## Minimax
+
+    def minimax(self, globina, maksimiziramo, koren=False):
+        """Metoda minimax. Vrne potezo (masko domine) in njeno vrednost.
+        V korenu preišče le poteze, ki zaradi simetrije plošče niso enakovredne."""
+        self.vozlisca += 1
+        if self.vozlisca & 1023 == 0:
+            self.preveri_omejitve()
+        visina = (stevilo_bitov(self.igra.rdeca | self.igra.modra) - self.zasedena_v_korenu) // 2
+        self.varianta[visina] = []
+        # Igre je konec.
+        if self.igra.stanje_igre() == KONEC:
+            # Igralec na potezi ne more položiti domine, zato je v normalni igri izgubil, v mizerni pa zmagal.
+            if maksimiziramo == self.igra.mizerna:
+                return (None, UTEZ)
+            else:
+                return (None, -UTEZ)
+        # Igre ni konec.
+        if globina == 0: # Zmanjkalo je globine.
+            self.listi += 1
+            return (None, self.vrednost_igre())
+        globina -=1
+        if koren:
+            domine = self.igra.razlicne_domine()
+        else:
+            domine = self.igra.domine()
+        self.uredi_poteze(domine, visina)
+        if maksimiziramo:  # Maksimiziramo
+            naj_poteza = None
+            naj_vrednost = -NESKONCNO
+            for domina in domine:
+                self.igra.odigraj(domina)
+                vrednost = self.minimax(globina, not maksimiziramo)[1]
+                self.igra.razveljavi(domina)
+                if vrednost > naj_vrednost:
+                    naj_vrednost = vrednost
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina] + self.varianta[visina + 1]
+                if self.prekini is True: # Igro prekinemo.
+                    break
+
+        else: # Minimiziramo
+            naj_poteza = None
+            naj_vrednost = NESKONCNO
+            for domina in domine:
+                self.igra.odigraj(domina)
+                vrednost = self.minimax(globina, not maksimiziramo)[1]
+                self.igra.razveljavi(domina)
+                if vrednost <= naj_vrednost:
+                    naj_vrednost = vrednost
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina] + self.varianta[visina + 1]
+                if self.prekini is True: # Igro prekinemo.
+                    break
+
+        assert (naj_poteza is not None), "minimax: izračunana poteza je None"
+        return (naj_poteza, naj_vrednost)
+
+###########################################################
+## Alfabeta
+
+    def alfabeta(self, globina, alfa, beta, maksimiziramo, koren=False):
+        """Metoda alfa-beta. Vrne potezo (masko domine) in njeno vrednost.
+        V korenu preišče le poteze, ki zaradi simetrije plošče niso enakovredne."""
+        self.vozlisca += 1
+        if self.vozlisca & 1023 == 0:
+            self.preveri_omejitve()
+        visina = (stevilo_bitov(self.igra.rdeca | self.igra.modra) - self.zasedena_v_korenu) // 2
+        self.varianta[visina] = []
+        # Igre je konec.
+        if self.igra.stanje_igre() == KONEC:
+            # Igralec na potezi ne more položiti domine, zato je v normalni igri izgubil, v mizerni pa zmagal.
+            if maksimiziramo == self.igra.mizerna:
+                return (None, UTEZ)
+            else:
+                return (None, -UTEZ)
+        # Igre ni konec.
+        if globina == 0: # Zmanjkalo je globine.
+            self.listi += 1
+            return (None, self.vrednost_igre())
+        # Pogledamo, ali smo pozicijo že preiskali.
+        tabelna_poteza = None
+        if self.tabela is not None:
+            (kljuc, simetrija) = self.igra.kljuc()
+            kljuc = (((kljuc << 1) | self.igra.mizerna) << 1) | maksimiziramo
+            zapis = self.tabela.poisci(kljuc)
+            if zapis is not None:
+                (_, globina_zapisa, vrednost_zapisa, vrsta, poteza_zapisa, _) = zapis
+                if poteza_zapisa is not None:
+                    tabelna_poteza = preslikaj(poteza_zapisa, self.igra.inverzi[simetrija])
+                if globina_zapisa >= globina and not koren:
+                    if vrsta == TOCNO:
+                        return (tabelna_poteza, vrednost_zapisa)
+                    if vrsta == SPODNJA_MEJA and vrednost_zapisa >= beta:
+                        return (tabelna_poteza, vrednost_zapisa)
+                    if vrsta == ZGORNJA_MEJA and vrednost_zapisa <= alfa:
+                        return (tabelna_poteza, vrednost_zapisa)
+        globina_vozlisca = globina
+        globina -=1
+        if koren:
+            domine = self.igra.razlicne_domine()
+        else:
+            domine = self.igra.domine()
+        self.uredi_poteze(domine, visina, tabelna_poteza, hevristike=not koren)
+        pvs = PVS in self.izboljsave
+        if globina == 0 and PAKETI in self.izboljsave: # Nasledniki so listi.
+            (naj_poteza, vrednost, vrsta) = self.oceni_liste(domine, alfa, beta, maksimiziramo, visina, koren)
+        elif maksimiziramo:  # Maksimiziramo
+            naj_poteza = None
+            for (k, domina) in enumerate(domine):
+                self.igra.odigraj(domina)
+                if k == 0 or not pvs:
+                    vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
+                else: # Z ničelnim oknom preverimo, ali je poteza boljša od alfe, in jo le tedaj preiščemo v celoti.
+                    vrednost = self.alfabeta(globina, alfa, alfa + 1, not maksimiziramo)[1]
+                    if alfa < vrednost < beta and self.prekini is not True:
+                        vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
+                self.igra.razveljavi(domina)
+                if vrednost > alfa:
+                    alfa = vrednost
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina] + self.varianta[visina + 1]
+                if alfa >= beta:
+                    self.rezi[visina] += 1
+                    self.zabelezi_rez(domina, visina, globina_vozlisca)
+                    break
+                if self.prekini is True: # Igro prekinemo.
+                    break
+            if naj_poteza is None: # Nobena poteza ni presegla alfe.
+                vrsta = ZGORNJA_MEJA
+            elif alfa >= beta:
+                vrsta = SPODNJA_MEJA
+            else:
+                vrsta = TOCNO
+            vrednost = alfa
+
+        else: # Minimiziramo
+            naj_poteza = None
+            for (k, domina) in enumerate(domine):
+                self.igra.odigraj(domina)
+                if k == 0 or not pvs:
+                    vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
+                else: # Z ničelnim oknom preverimo, ali je poteza manjša od bete, in jo le tedaj preiščemo v celoti.
+                    vrednost = self.alfabeta(globina, beta - 1, beta, not maksimiziramo)[1]
+                    if alfa < vrednost < beta and self.prekini is not True:
+                        vrednost = self.alfabeta(globina, alfa, beta, not maksimiziramo)[1]
+                self.igra.razveljavi(domina)
+                if vrednost < beta:
+                    beta = vrednost
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina] + self.varianta[visina + 1]
+                if alfa >= beta:
+                    self.rezi[visina] += 1
+                    self.zabelezi_rez(domina, visina, globina_vozlisca)
+                    break
+                if self.prekini is True: # Igro prekinemo.
+                    break
+            if naj_poteza is None: # Nobena poteza ni bila manjša od bete.
+                vrsta = SPODNJA_MEJA
+            elif alfa >= beta:
+                vrsta = ZGORNJA_MEJA
+            else:
+                vrsta = TOCNO
+            vrednost = beta
+
+        if self.tabela is not None and not self.prekini:
+            if naj_poteza is not None:
+                kanonicna_poteza = preslikaj(naj_poteza, self.igra.simetrije[simetrija])
+            else:
+                kanonicna_poteza = None
+            self.tabela.shrani(kljuc, globina_vozlisca, vrednost, vrsta, kanonicna_poteza)
+        return (naj_poteza, vrednost)
+
+    def oceni_liste(self, domine, alfa, beta, maksimiziramo, visina, koren=False):
+        """Vozlišče alfa-beta, katerega nasledniki so listi. Vrednosti naslednikov izračuna brez igranja
+        potez, v dveh paketih: najprej prvih PRVI_PAKET (urejene poteze pogosto takoj povzročijo rez), nato
+        vseh ostalih naenkrat. Pregleda jih v danem vrstnem redu z enakimi rezi, kot bi jih alfabeta, zato
+        sta poteza in vrednost enaki, le hitreje. Vrne (naj_poteza, vrednost, vrsta vrednosti)."""
+        vse = self.igra.domine() if koren else domine # V korenu so simetrične poteze izpuščene.
+        if len(vse) <= NAJVEC_SOSEDNJIH_DOMIN: # Sicer ima vsak naslednik še kakšno potezo.
+            vrednosti = self.vrednosti_naslednikov(domine)
+            koncna = UTEZ if maksimiziramo != self.igra.mizerna else -UTEZ # Nasprotnik ne more položiti domine.
+            for (k, domina) in enumerate(domine):
+                if all(druga & domina for druga in vse):
+                    vrednosti[k] = koncna
+        else:
+            vrednosti = self.vrednosti_naslednikov(domine[:PRVI_PAKET])
+        naj_poteza = None
+        if maksimiziramo:
+            for (k, domina) in enumerate(domine):
+                if k == len(vrednosti):
+                    vrednosti.extend(self.vrednosti_naslednikov(domine[k:]))
+                if vrednosti[k] > alfa:
+                    alfa = vrednosti[k]
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina]
+                if alfa >= beta:
+                    break
+            (vrednost, rez) = (alfa, alfa >= beta)
+            vrsta = ZGORNJA_MEJA if naj_poteza is None else SPODNJA_MEJA if rez else TOCNO
+        else:
+            for (k, domina) in enumerate(domine):
+                if k == len(vrednosti):
+                    vrednosti.extend(self.vrednosti_naslednikov(domine[k:]))
+                if vrednosti[k] < beta:
+                    beta = vrednosti[k]
+                    naj_poteza = domina
+                    self.varianta[visina] = [domina]
+                if alfa >= beta:
+                    break
+            (vrednost, rez) = (beta, alfa >= beta)
+            vrsta = SPODNJA_MEJA if naj_poteza is None else ZGORNJA_MEJA if rez else TOCNO
+        if rez:
+            self.rezi[visina] += 1
+            self.zabelezi_rez(domina, visina, 1)
+        # Preiskane naslednike štejemo kot vozlišča, kot da bi jih obiskali.
+        self.vozlisca += k + 1
+        self.listi += sum(1 for vrednost in vrednosti[:k + 1] if abs(vrednost) < UTEZ)
+        if self.vozlisca & 1023 <= k: # Števec je prešel večkratnik 1024.
+            self.preveri_omejitve()
+        return (naj_poteza, vrednost, vrsta)
+
+###########################################################
+## Monte Carlo
+
+    def monte_carlo(self, cas):
+        """Iskanje Monte Carlo (UCT) do roka. Vsaka iteracija šteje kot eno vozlišče.
+        Vrne najpogosteje obiskano potezo v korenu."""
+        self.pripravi_iskanje(cas)
+        if self.drevo is None:
+            self.drevo = DrevoMCTS()
+        self.drevo.pripravi(self.igra)
+        while self.prekini is not True:
+            self.drevo.iteracija()
+            self.vozlisca += 1
+            if self.vozlisca & 255 == 0:
+                self.povzemi_drevo(self.drevo.statistika_korena(), self.drevo.glavna_varianta())
+                self.preveri_omejitve()
+        return self.povzemi_drevo(self.drevo.statistika_korena(), self.drevo.glavna_varianta())
+
+    def povzemi_drevo(self, statistika_korena, varianta):
+        """Iz obiskov in zmag potez v korenu izbere najpogosteje obiskano potezo in jo vrne. Vrednost je
+        njen delež zmag, globina pa dolžina glavne variante."""
+        if not statistika_korena:
+            return None
+        domina = max(statistika_korena, key=lambda domina: statistika_korena[domina][0])
+        (obiski, zmage) = statistika_korena[domina]
+        self.vrednost = zmage / obiski
+        if varianta[:1] != [domina]:
+            varianta = [domina]
+        self.prejsnja_varianta = varianta
+        self.globina = len(varianta)
+        return domina
+
+    def vzporedni_monte_carlo(self, cas):
+        """Iskanje Monte Carlo, pri katerem vsak proces iskalca do roka gradi svoje drevo (vzporednost
+        v korenu). Na koncu seštejemo obiske in zmage potez v korenu."""
+        self.pripravi_iskanje(cas)
+        self.iskalec.novo_iskanje()
+        stanje = (self.igra.velikost, self.igra.rdeca, self.igra.modra, self.igra.na_potezi, self.igra.mizerna)
+        if self.premisljuje:
+            rok = float("inf")
+        else:
+            rok = time.time() + (self.rok - time.perf_counter())
+        naloge = [self.iskalec.bazen.submit(preisci_mcts, (stanje, rok)) for k in range(self.iskalec.stevilo_procesov)]
+        statistika_korena = {}
+        variante = []
+        cakajo = set(naloge)
+        while cakajo:
+            (koncane, cakajo) = concurrent.futures.wait(cakajo, timeout=CAKANJE, return_when=concurrent.futures.FIRST_COMPLETED)
+            for naloga in koncane:
+                if naloga.cancelled():
+                    continue
+                (statistika, igre, varianta) = naloga.result()
+                self.vozlisca += igre
+                variante.append(varianta)
+                for (domina, (obiski, zmage)) in statistika.items():
+                    (vsi_obiski, vse_zmage) = statistika_korena.get(domina, (0, 0))
+                    statistika_korena[domina] = (vsi_obiski + obiski, vse_zmage + zmage)
+            if self.opazovalci and time.perf_counter() >= self.naslednje_obvestilo:
+                self.obvesti()
+            if self.prekini is True or (time.perf_counter() > self.rok and not self.premisljuje):
+                self.iskalec.prekinitev.set()
+                for naloga in cakajo:
+                    naloga.cancel()
+        domina = self.povzemi_drevo(statistika_korena, [])
+        for varianta in variante:
+            if varianta[:1] == [domina] and len(varianta) > len(self.prejsnja_varianta):
+                self.prejsnja_varianta = varianta
+                self.globina = len(varianta)
+        if domina is None: # Noben proces ni odigral niti ene igre.
+            domina = self.igra.domine()[0]
+        return domina
+
+###########################################################
+## Vzporedno iskanje
+
+    def vzporedno_poglabljanje(self, cas, najvecja_globina=None):
+        """Alfa-beta z iterativnim poglabljanjem, pri kateri poteze v korenu razdelimo med procese iskalca.
+        Najprej preiščemo najobetavnejšo potezo, da dobimo dobro spodnjo mejo, nato ostale hkrati.
+        Vrne najboljšo potezo zadnje dokončane globine."""
+        self.pripravi_iskanje(cas)
+        if najvecja_globina is None:
+            najvecja_globina = stevilo_bitov(self.igra.prosta()) // 2
+        domine = self.igra.razlicne_domine()
+        vrednosti = {} # Vrednosti (oz. zgornje meje) potez v korenu iz prejšnje globine.
+        naj_poteza = None
+        self.iskalec.novo_iskanje()
+        for globina in range(1, najvecja_globina + 1):
+            domine.sort(key=lambda domina: vrednosti.get(domina, -NESKONCNO), reverse=True)
+            self.iskalec.alfa.value = -NESKONCNO
+            (rezultati, dokoncano) = self.razdeli_poteze(domine[:1], globina)
+            if dokoncano:
+                (ostali, dokoncano) = self.razdeli_poteze(domine[1:], globina)
+                rezultati.extend(ostali)
+            if not rezultati or rezultati[0][0] != domine[0]:
+                break # Prve poteze nismo dokončali, zato globina ni uporabna.
+            # Vrednost je točna, če je poteza presegla mejo, s katero smo jo začeli preiskovati.
+            # Prva poteza je vedno točna; če globina ni dokončana, izberemo najboljšo med dokončanimi.
+            tocni = [(vrednost, -domine.index(domina), domina, varianta)
+                     for (domina, vrednost, alfa, varianta) in rezultati if vrednost > alfa]
+            (vrednost, _, poteza, varianta) = max(tocni)
+            for (domina, vrednost_domine, _, _) in rezultati:
+                vrednosti[domina] = vrednost_domine
+            naj_poteza = poteza
+            self.vrednost = vrednost
+            self.prejsnja_varianta = [poteza] + varianta
+            self.varianta[0] = self.prejsnja_varianta
+            if not dokoncano:
+                break
+            self.globina = globina
+            self.koncaj_globino()
+            if abs(vrednost) >= UTEZ: # Izid igre je znan.
+                break
+        if naj_poteza is None: # Niti prva globina ni bila dokončana.
+            naj_poteza = domine[0]
+        return naj_poteza
+
+    def razdeli_poteze(self, domine, globina):
+        """Pošlje poteze procesom iskalca in počaka, da jih preiščejo. Vrne seznam dokončanih
+        (domina, vrednost, alfa ob začetku, varianta) in True, če se je iskanje vseh potez končalo."""
+        stanje = (self.igra.velikost, self.igra.rdeca, self.igra.modra, self.igra.na_potezi, self.igra.mizerna)
+        if self.premisljuje: # Roka ne poznamo, zato delavce ustavimo z zastavico.
+            rok = float("inf")
+        else:
+            rok = time.time() + (self.rok - time.perf_counter()) # Procesi nimajo skupnega perf_counter.
+        naloge = {}
+        for domina in domine:
+            if self.prejsnja_varianta[:1] == [domina]:
+                varianta = self.prejsnja_varianta
+            else:
+                varianta = []
+            naloga = (self.iskalec.iskanje, stanje, domina, globina, rok, varianta)
+            naloge[self.iskalec.bazen.submit(preisci_potezo, naloga)] = domina
+        rezultati = []
+        dokoncano = True
+        cakajo = set(naloge)
+        while cakajo:
+            (koncane, cakajo) = concurrent.futures.wait(cakajo, timeout=CAKANJE, return_when=concurrent.futures.FIRST_COMPLETED)
+            for naloga in koncane:
+                if naloga.cancelled():
+                    dokoncano = False
+                    continue
+                (vrednost, alfa, varianta, vozlisca, listi, rezi, prekinjeno) = naloga.result()
+                self.vozlisca += vozlisca
+                self.listi += listi
+                for (visina, stevilo) in enumerate(rezi):
+                    self.rezi[visina] += stevilo
+                if prekinjeno:
+                    dokoncano = False
+                else:
+                    rezultati.append((naloge[naloga], vrednost, alfa, varianta))
+            if self.opazovalci and time.perf_counter() >= self.naslednje_obvestilo:
+                self.obvesti()
+            if self.prekini is True or (time.perf_counter() > self.rok and not self.premisljuje):
+                # Delavci to opazijo v največ 1024 vozliščih, nato počakamo, da vrnejo delne rezultate.
+                self.iskalec.prekinitev.set()
+                for naloga in cakajo:
+                    naloga.cancel()
+        return (rezultati, dokoncano)
+
+class VzporedniIskalec():
+    """Skupina procesov, ki hkrati preiskujejo poteze v korenu. Procesi ostanejo živi med potezami in
+    vsak ima svojo transpozicijsko tabelo. Najboljšo vrednost v korenu (alfo) si delijo preko skupnega
+    pomnilnika, zato naloga, ki se začne kasneje, reže z boljšo mejo."""
+
+    def __init__(self, stevilo_procesov):
+        # Procese ustvarimo na novo (spawn), ker fork ob vlaknih in odprtem Tk ni varen.
+        kontekst = multiprocessing.get_context("spawn")
+        self.stevilo_procesov = stevilo_procesov
+        self.alfa = kontekst.Value("q", -NESKONCNO)
+        self.prekinitev = kontekst.Event()
+        self.iskanje = 0 # Zaporedna številka iskanja, da delavci vedo, kdaj začeti novo generacijo tabele.
+        self.zaklep = threading.Lock() # Iskalca hkrati uporablja le eno iskanje.
+        self.bazen = concurrent.futures.ProcessPoolExecutor(stevilo_procesov, mp_context=kontekst,
+                                                            initializer=zacni_delavca,
+                                                            initargs=(self.alfa, self.prekinitev))
+
+    def novo_iskanje(self):
+        """Pripravi iskalca na novo iskanje. Prejšnje iskanje je moralo počakati na vse svoje naloge."""
+        self.iskanje += 1
+        self.prekinitev.clear()
+
+    def zapri(self):
+        """Ustavi procese."""
+        self.prekinitev.set()
+        self.bazen.shutdown(wait=True, cancel_futures=True)
+
+_iskalci = {}
+
+def vzporedni_iskalec(stevilo_procesov):
+    """Vrne skupino s stevilo_procesov procesi, ki se ustvari le enkrat. Za en proces vrne None, saj
+    je takrat zaporedno iskanje v istem procesu hitrejše."""
+    if stevilo_procesov <= 1:
+        return None
+    if stevilo_procesov not in _iskalci:
+        _iskalci[stevilo_procesov] = VzporedniIskalec(stevilo_procesov)
+    return _iskalci[stevilo_procesov]
+
+def zapri_iskalce():
+    """Ustavi procese vseh ustvarjenih skupin."""
+    for iskalec in _iskalci.values():
+        iskalec.zapri()
+    _iskalci.clear()
+
+# Stanje procesa delavca: skupna alfa, zastavica za prekinitev, tabela in številka zadnjega iskanja.
+_delavec = {}
+
+def zacni_delavca(alfa, prekinitev):
+    """Pripravi proces delavca. Pokliče se enkrat ob zagonu procesa."""
+    _delavec["alfa"] = alfa
+    _delavec["prekinitev"] = prekinitev
+    _delavec["tabela"] = TranspozicijskaTabela()
+    _delavec["drevo"] = DrevoMCTS() # Vsak proces ima svoje naključno seme.
+    _delavec["iskanje"] = None
+
+def igra_iz_stanja(stanje):
+    """Vrne igro iz stanja (velikost, rdeca, modra, na_potezi, mizerna), ki ga glavni proces pošlje delavcem."""
+    ((vrstice, stolpci), rdeca, modra, na_potezi, mizerna) = stanje
+    igra = Igra(vrstice, stolpci, mizerna)
+    igra.rdeca = rdeca
+    igra.modra = modra
+    igra.na_potezi = na_potezi
+    igra.izracunaj_zobrist()
+    igra.izracunaj_oceno()
+    return igra
+
+def preisci_potezo(naloga):
+    """V procesu delavca z alfa-beta preišče eno potezo v korenu. Vrne (vrednost, alfa ob začetku,
+    varianta po potezi, število vozlišč, število listov, rezi po višinah, prekinjeno)."""
+    (iskanje, stanje, domina, globina, rok, varianta) = naloga
+    alfa = _delavec["alfa"].value
+    if _delavec["prekinitev"].is_set():
+        return (None, alfa, [], 0, 0, [], True)
+    tabela = _delavec["tabela"]
+    if _delavec["iskanje"] != iskanje:
+        tabela.novo_iskanje()
+        _delavec["iskanje"] = iskanje
+    igra = igra_iz_stanja(stanje)
+    algoritem = Algoritem(igra, tabela)
+    algoritem.pripravi_iskanje(rok - time.time())
+    algoritem.prekinitev = _delavec["prekinitev"]
+    algoritem.prejsnja_varianta = varianta
+    igra.odigraj(domina)
+    vrednost = algoritem.alfabeta(globina - 1, alfa, NESKONCNO, False)[1]
+    if algoritem.prekini:
+        return (None, alfa, [], algoritem.vozlisca, algoritem.listi, algoritem.rezi, True)
+    if vrednost > alfa:
+        with _delavec["alfa"].get_lock():
+            if vrednost > _delavec["alfa"].value:
+                _delavec["alfa"].value = vrednost
+    return (vrednost, alfa, algoritem.varianta[1], algoritem.vozlisca, algoritem.listi, algoritem.rezi, False)
+
+def preisci_mcts(naloga):
+    """V procesu delavca z iskanjem Monte Carlo do roka preišče pozicijo. Drevo procesa ostane med
+    potezami. Vrne (obiski in zmage potez v korenu, število naključnih iger, glavna varianta)."""
+    (stanje, rok) = naloga
+    if _delavec["prekinitev"].is_set():
+        return ({}, 0, [])
+    algoritem = Algoritem(igra_iz_stanja(stanje), drevo=_delavec["drevo"])
+    algoritem.prekinitev = _delavec["prekinitev"]
+    algoritem.monte_carlo(rok - time.time())
+    return (algoritem.drevo.statistika_korena(), algoritem.vozlisca, algoritem.prejsnja_varianta)
+
+class DnevnikIskanja():
+    """Opazovalec, ki statistiko vsakega končanega iskanja (ene poteze) doda v datoteko kot vrstico JSON."""
+
+    def __init__(self, pot):
+        self.pot = pot
+
+    def __call__(self, statistika):
+        if statistika["koncano"]:
+            with open(self.pot, "a") as datoteka:
+                datoteka.write(json.dumps(statistika) + "\n")
+
+def igra_iz_opisa(vrstice):
+    """Vrne igro iz seznama vrstic, v katerih je "#" pokrito in "." nepokrito polje."""
+    igra = Igra(len(vrstice), len(vrstice[0]))
+    igra.plosca = [[RDECI if polje == "#" else NEPOKRITO for polje in vrstica] for vrstica in vrstice]
+    return igra
+
+def profiliraj(igra, metoda, cas, pot=None, vrstic=30):
+    """Poišče potezo pod cProfile in izpiše statistiko iskanja ter funkcije, ki so porabile največ časa.
+    Če je podana pot, surove podatke profila shrani vanjo (za pstats ali snakeviz)."""
+    resevalec = MizerniResevalec() if igra.mizerna else Resevalec(nalozi_bazo())
+    algoritem = Algoritem(igra, TranspozicijskaTabela(), resevalec)
+    profil = cProfile.Profile()
+    profil.enable()
+    domina = algoritem.isci(metoda, cas)
+    profil.disable()
+    for (kljuc, vrednost) in algoritem.statistika(domina).items():
+        print("{0}: {1}".format(kljuc, json.dumps(vrednost)))
+    if pot is not None:
+        profil.dump_stats(pot)
+    pstats.Stats(profil).sort_stats("cumulative").print_stats(vrstic)
+
+def porocilo_skaliranja(najvec_procesov, velikost=(7, 7), globina=5, poteze=2):
+    """Izpiše število vozlišč na sekundo in čas do vsake globine pri zaporednem iskanju in pri
+    vzporednem iskanju z 2 do najvec_procesov procesi. Pozicijo dobimo z nekaj naključnimi potezami."""
+    generator = random.Random(0)
+    igra = Igra(*velikost)
+    for k in range(poteze):
+        igra.odigraj(generator.choice(igra.domine()))
+    print("Plošča {0}x{1} po {2} potezah, globina {3}.".format(velikost[0], velikost[1], poteze, globina))
+    print("{0:>8} {1:>10} {2:>12} {3:>9}  {4}".format("procesi", "vozlišča", "vozlišča/s", "pospešek", "čas do globine [s]"))
+    osnova = None
+    for procesi in range(1, najvec_procesov + 1):
+        iskalec = vzporedni_iskalec(procesi)
+        algoritem = Algoritem(igra.kopija_igre(), TranspozicijskaTabela(), None, iskalec)
+        if iskalec is not None:
+            # Procese zaženemo vnaprej, da njihov zagon ne šteje v čas iskanja.
+            list(iskalec.bazen.map(time.sleep, [0.1] * procesi))
+        zacetek = time.perf_counter()
+        if iskalec is None:
+            algoritem.iterativno_poglabljanje(ALFABETA, float("inf"), najvecja_globina=globina)
+        else:
+            algoritem.vzporedno_poglabljanje(float("inf"), najvecja_globina=globina)
+        cas = time.perf_counter() - zacetek
+        if osnova is None:
+            osnova = cas
+        print("{0:>8} {1:>10} {2:>12.0f} {3:>9.2f}  {4}".format(
+            procesi, algoritem.vozlisca, algoritem.vozlisca / cas, osnova / cas,
+            " ".join("{0:.2f}".format(t) for t in algoritem.casi_globin)))
+    zapri_iskalce()
+
+######################################################################
+## Baza nimberjev
+
+# Datoteka ima glavo (oznaka, število zapisov, dolžina zapisa), ki ji sledijo po ključu urejeni zapisi
+# fiksne dolžine: višina regije (1 bajt), širina regije (1 bajt), maska (21 bajtov) in nimber (1 bajt).
+OZNAKA_BAZE = b"CRAMNIM1"
+GLAVA_BAZE = struct.Struct("<8sIHH")
+BAJTI_MASKE = 21 # Dovolj za regije z očrtanim pravokotnikom do 12x12 polj.
+DOLZINA_KLJUCA = 2 + BAJTI_MASKE
+DOLZINA_ZAPISA = DOLZINA_KLJUCA + 1
+POT_BAZE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nimberji.bin")
+
+def zapis_kljuca(kljuc):
+    """Vrne ključ regije kot niz bajtov, ki se ureja enako kot zapisi v bazi, oz. None, če regija ni zapisljiva."""
+    (visina_regije, sirina_regije, maska) = kljuc
+    if visina_regije * sirina_regije > 8 * BAJTI_MASKE:
+        return None
+    return bytes((visina_regije, sirina_regije)) + maska.to_bytes(BAJTI_MASKE, "big")
+
+class BazaNimberjev():
+    """Baza nimberjev regij na disku, preslikana v pomnilnik. Le bere, zato jo lahko hkrati uporablja več procesov."""
+
+    def __init__(self, pot=POT_BAZE):
+        with open(pot, "rb") as datoteka:
+            self.pomnilnik = mmap.mmap(datoteka.fileno(), 0, access=mmap.ACCESS_READ)
+        (oznaka, self.stevilo, dolzina, _) = GLAVA_BAZE.unpack_from(self.pomnilnik, 0)
+        assert oznaka == OZNAKA_BAZE and dolzina == DOLZINA_ZAPISA, "baza: neveljavna datoteka"
+        self.zadetki = 0
+
+    def poisci(self, kljuc):
+        """Z bisekcijo poišče nimber regije s kanoničnim ključem. Vrne None, če ga v bazi ni."""
+        iskani = zapis_kljuca(kljuc)
+        if iskani is None:
+            return None
+        levo = 0
+        desno = self.stevilo
+        while levo < desno:
+            sredina = (levo + desno) // 2
+            zacetek = GLAVA_BAZE.size + sredina * DOLZINA_ZAPISA
+            if self.pomnilnik[zacetek : zacetek + DOLZINA_KLJUCA] < iskani:
+                levo = sredina + 1
+            else:
+                desno = sredina
+        zacetek = GLAVA_BAZE.size + levo * DOLZINA_ZAPISA
+        if levo < self.stevilo and self.pomnilnik[zacetek : zacetek + DOLZINA_KLJUCA] == iskani:
+            self.zadetki += 1
+            return self.pomnilnik[zacetek + DOLZINA_KLJUCA]
+        return None
+
+    def zapisi(self):
+        """Našteje vse pare (ključ, nimber) v bazi."""
+        for indeks in range(self.stevilo):
+            zacetek = GLAVA_BAZE.size + indeks * DOLZINA_ZAPISA
+            zapis = self.pomnilnik[zacetek : zacetek + DOLZINA_ZAPISA]
+            yield ((zapis[0], zapis[1], int.from_bytes(zapis[2:DOLZINA_KLJUCA], "big")), zapis[DOLZINA_KLJUCA])
+
+    def zapri(self):
+        self.pomnilnik.close()
+
+def nalozi_bazo(pot=POT_BAZE):
+    """Vrne bazo nimberjev oz. None, če datoteke ni."""
+    if not os.path.exists(pot):
+        return None
+    return BazaNimberjev(pot)
+
+def shrani_bazo(pot, nimberji):
+    """Zapiše slovar kanonični ključ -> nimber v datoteko. Bazo najprej zapiše v začasno datoteko
+    in jo šele nato preimenuje, da procesi, ki berejo staro bazo, ne vidijo napol zapisane."""
+    zapisi = []
+    for (kljuc, nimber) in nimberji.items():
+        zapis = zapis_kljuca(kljuc)
+        if zapis is not None:
+            zapisi.append(zapis + bytes((nimber,)))
+    zapisi.sort()
+    zacasna = pot + ".tmp"
+    with open(zacasna, "wb") as datoteka:
+        datoteka.write(GLAVA_BAZE.pack(OZNAKA_BAZE, len(zapisi), DOLZINA_ZAPISA, 0))
+        for zapis in zapisi:
+            datoteka.write(zapis)
+    os.replace(zacasna, pot)
+    return len(zapisi)
+
+def polimine(najvec_polj):
+    """Vrne kanonične ključe vseh povezanih regij z 2 do najvec_polj polji. Regije z n+1 polji dobimo tako,
+    da regijam z n polji na vse možne načine dodamo sosednje polje."""
+    kljuci = []
+    nivo = {kanonicni_kljuc_polj([(0, 0), (0, 1)])}
+    for stevilo_polj in range(2, najvec_polj + 1):
+        kljuci.extend(sorted(nivo))
+        if stevilo_polj == najvec_polj:
+            break
+        naslednji = set()
+        for (visina_regije, sirina_regije, maska) in nivo:
+            polja = set()
+            for i in range(visina_regije):
+                for j in range(sirina_regije):
+                    if maska >> (i * sirina_regije + j) & 1:
+                        polja.add((i, j))
+            for (i, j) in polja:
+                for sosed in ((i+1, j), (i-1, j), (i, j+1), (i, j-1)):
+                    if sosed not in polja:
+                        naslednji.add(kanonicni_kljuc_polj(list(polja) + [sosed]))
+        nivo = naslednji
+    return kljuci
+
+def zgradi_bazo(pot=POT_BAZE, najvec_polj=10, polna_velikost=5):
+    """Izračuna nimberje vseh regij z največ najvec_polj polji in vseh regij, ki se lahko pojavijo
+    na plošči polna_velikost x polna_velikost (s tem je ta plošča v celoti rešena), ter jih shrani v bazo."""
+    resevalec = Resevalec(nalozi_bazo(pot))
+    zacetek = time.perf_counter()
+    kljuci = polimine(najvec_polj)
+    print("Regij z največ {0} polji: {1}".format(najvec_polj, len(kljuci)))
+    for kljuc in kljuci:
+        resevalec.nimber_kljuca(kljuc)
+    if polna_velikost:
+        igra = Igra(polna_velikost)
+        nimber = resevalec.vrednost(igra.prosta(), igra.sirina)
+        print("Nimber prazne plošče {0}x{0}: {1}".format(polna_velikost, nimber))
+    if resevalec.baza is not None:
+        # Ohranimo tudi zapise stare baze, ki jih tokrat nismo potrebovali.
+        for (kljuc, nimber) in resevalec.baza.zapisi():
+            resevalec.nimberji.setdefault(kljuc, nimber)
+        resevalec.baza.zapri()
+    stevilo = shrani_bazo(pot, resevalec.nimberji)
+    print("V bazo {0} je zapisanih {1} regij ({2:.1f} s).".format(pot, stevilo, time.perf_counter() - zacetek))
+
+######################################################################
+## Zapisi iger
+
+# Datoteka z zapisi iger se začne z oznako, ki ji sledijo zapisi iger. Zapis ima glavo (vrstice, stolpci,
+# zastavice, število potez), ki ji sledijo indeksi položenih domin v seznamu mest_domin plošče: en bajt
+# na domino, na plošči z več kot 256 mesti (12x12) pa dva. Zapise beremo in pišemo enega za drugim,
+# zato datoteke nikoli ne naložimo v pomnilnik v celoti in ji lahko zapise le dodajamo.
+OZNAKA_ZAPISOV = b"CRAMIGR1"
+GLAVA_ZAPISA = struct.Struct("<BBBH")
+ZASTAVICA_MIZERNA = 1
+
+_mesta = {} # Predpomnilnik mest za domine za posamezne velikosti plošče.
+
+def mesta_domin(vrstice, stolpci):
+    """Vrne urejen seznam mask vseh mest za domino na prazni plošči in slovar maska -> indeks."""
+    if (vrstice, stolpci) not in _mesta:
+        mesta = sorted(crte_domin(vrstice, stolpci))
+        _mesta[(vrstice, stolpci)] = (mesta, {domina: indeks for (indeks, domina) in enumerate(mesta)})
+    return _mesta[(vrstice, stolpci)]
+
+def oblika_potez(vrstice, stolpci):
+    """Vrne format struct, s katerim zapišemo en indeks domine na plošči dane velikosti."""
+    return "B" if len(crte_domin(vrstice, stolpci)) <= 256 else "H"
+
+class PisecIger():
+    """Dodaja zapise iger na konec datoteke. Če je datoteka prazna ali je ni, najprej zapiše oznako."""
+
+    def __init__(self, pot):
+        self.datoteka = open(pot, "ab")
+        if self.datoteka.tell() == 0:
+            self.datoteka.write(OZNAKA_ZAPISOV)
+        self.stevilo = 0 # Število zapisanih iger.
+
+    def zapisi(self, velikost, mizerna, domine):
+        """Zapiše igro na plošči dane velikosti, v kateri so bile zaporedoma položene dane domine."""
+        (vrstice, stolpci) = velikost
+        (_, indeksi) = mesta_domin(vrstice, stolpci)
+        zastavice = ZASTAVICA_MIZERNA if mizerna else 0
+        self.datoteka.write(GLAVA_ZAPISA.pack(vrstice, stolpci, zastavice, len(domine)))
+        self.datoteka.write(struct.pack("<{0}{1}".format(len(domine), oblika_potez(vrstice, stolpci)),
+                                        *(indeksi[domina] for domina in domine)))
+        self.stevilo += 1
+
+    def zapisi_igro(self, igra):
+        """Zapiše igro, odigrano z naredi_potezo."""
+        self.zapisi(igra.velikost, igra.mizerna, igra.odigrane)
+
+    def zapri(self):
+        self.datoteka.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *izjema):
+        self.zapri()
+
+def beri_igre(pot):
+    """Našteje igre iz datoteke z zapisi kot trojice (velikost, mizerna, domine). Bere zapis za zapisom."""
+    with open(pot, "rb") as datoteka:
+        assert datoteka.read(len(OZNAKA_ZAPISOV)) == OZNAKA_ZAPISOV, "zapisi: neveljavna datoteka"
+        while True:
+            glava = datoteka.read(GLAVA_ZAPISA.size)
+            if not glava:
+                break
+            assert len(glava) == GLAVA_ZAPISA.size, "zapisi: nepopoln zapis"
+            (vrstice, stolpci, zastavice, stevilo) = GLAVA_ZAPISA.unpack(glava)
+            oblika = struct.Struct("<{0}{1}".format(stevilo, oblika_potez(vrstice, stolpci)))
+            poteze = datoteka.read(oblika.size)
+            assert len(poteze) == oblika.size, "zapisi: nepopoln zapis"
+            (mesta, _) = mesta_domin(vrstice, stolpci)
+            yield ((vrstice, stolpci), bool(zastavice & ZASTAVICA_MIZERNA), [mesta[indeks] for indeks in oblika.unpack(poteze)])
+
+def pozicije_igre(velikost, mizerna, domine):
+    """Ponovi igro in našteje pozicije pred vsako potezo in po zadnji potezi."""
+    igra = Igra(*velikost, mizerna=mizerna)
+    yield igra.kopija_igre()
+    for domina in domine:
+        assert igra.prosta() & domina == domina, "zapisi: neveljavna poteza"
+        igra.odigraj(domina)
+        yield igra.kopija_igre()
+
+######################################################################
+#GLAVNI PROGRAM
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Orodja za igro Cram brez grafičnega vmesnika.")
+    parser.add_argument("--zgradi-bazo", action="store_true", help="izračuna bazo nimberjev regij in jo shrani na disk")
+    parser.add_argument("--baza", default=POT_BAZE, help="pot do baze nimberjev")
+    parser.add_argument("--polja", type=int, default=10, help="baza vsebuje vse regije s toliko ali manj polji")
+    parser.add_argument("--polna", type=int, default=5, help="velikost plošče, ki jo baza reši v celoti (0 za nobeno)")
+    parser.add_argument("--skaliranje", type=int, metavar="N", help="izpiše hitrost iskanja z 1 do N procesi")
+    parser.add_argument("--velikost", type=preberi_velikost, default=(7, 7), help="velikost plošče za --skaliranje, npr. 7 ali 6x8")
+    parser.add_argument("--globina", type=int, default=5, help="globina iskanja za --skaliranje")
+    parser.add_argument("--profiliraj", action="store_true", help="poišče potezo pod cProfile in izpiše profil")
+    parser.add_argument("--pozicija", help='pozicija za --profiliraj, vrstice ločene z "/", npr. "..##./....."; privzeto prazna plošča velikosti --velikost')
+    parser.add_argument("--metoda", default=ALFABETA, choices=(MINIMAX, ALFABETA, NIMBERJI, MCTS), help="metoda za --profiliraj")
+    parser.add_argument("--cas", type=float, default=3.0, help="čas za razmišljanje v sekundah za --profiliraj")
+    parser.add_argument("--profil", help="datoteka, v katero --profiliraj shrani surove podatke profila")
+    parser.add_argument("--mizerna", action="store_true", help="--profiliraj išče potezo v mizerni igri")
+    argumenti = parser.parse_args()
+    if argumenti.zgradi_bazo:
+        zgradi_bazo(argumenti.baza, argumenti.polja, argumenti.polna)
+    elif argumenti.skaliranje:
+        porocilo_skaliranja(argumenti.skaliranje, argumenti.velikost, argumenti.globina)
+    elif argumenti.profiliraj:
+        if argumenti.pozicija:
+            igra = igra_iz_opisa(argumenti.pozicija.split("/"))
+        else:
+            igra = Igra(*argumenti.velikost)
+        igra.mizerna = argumenti.mizerna
+        profiliraj(igra, argumenti.metoda, argumenti.cas, argumenti.profil)
+    else:
+        parser.print_help()
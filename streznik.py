@@ -0,0 +1,413 @@
+"""Strežnik pogona Cram z vrstičnim besedilnim protokolom, podobnim UCI, preko standardnega vhoda in izhoda
+ali lokalnega vtiča TCP. Iskanja tečejo v skupini procesov motorjev, ki jih zaženemo ob zagonu strežnika in
+ostanejo živi med iskanji, zato vsak obdrži svojo transpozicijsko tabelo, naloženo bazo nimberjev, znane
+pozicije mizernega rešitelja in drevo Monte Carlo.
+
+Ukazi (en ukaz v vrstici, odgovori so prav tako vrstice):
+    cram                                    -> id ime Cram, id metode ..., cramok
+    pripravljen                             -> pripravljenok
+    pozicija 7x7 [mizerna] [poteze 0,0,0,1 2,2,3,2 ...]
+    isci [cas 0.5] [metoda alfabeta]        -> info globina ... vozlisca ... in najboljsa x1,y1,x2,y2
+    ustavi                                  -> iskanje konča takoj in odgovori z najboljšo potezo
+    statistika                              -> statistika {JSON}
+    konec
+Če ukaz ni veljaven, strežnik odgovori z "napaka opis". Če so vsi motorji zasedeni, isci počaka na prostega.
+
+Primeri: python streznik.py --procesi 4               (ukazi s standardnega vhoda)
+         python streznik.py --vrata 5000 --procesi 4  (strežnik TCP na 127.0.0.1:5000)
+         python streznik.py --obremenitev --vrata 5000 --odjemalci 8 --zahteve 50"""
+
+import argparse
+import concurrent.futures
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from motor import (Igra, Algoritem, TranspozicijskaTabela, DrevoMCTS, Resevalec, MizerniResevalec, nalozi_bazo, igra_iz_stanja,
+                   preberi_velikost, MINIMAX, ALFABETA, NIMBERJI, MCTS)
+
+METODE = (MINIMAX, ALFABETA, NIMBERJI, MCTS)
+PRIVZETA_METODA = NIMBERJI
+PRIVZETI_CAS = 1.0 # Čas za iskanje v sekundah, če ga ukaz isci ne poda.
+NASLOV = "127.0.0.1" # Strežnik sprejema le lokalne povezave.
+
+# Stanje procesa motorja: zastavice za prekinitev, tabela, rešitelja in drevo, ki ostanejo med iskanji.
+_motor = {}
+
+def zacni_motor(prekinitve):
+    """Pripravi proces motorja. Pokliče se enkrat ob zagonu procesa."""
+    _motor["prekinitve"] = prekinitve
+    _motor["tabela"] = TranspozicijskaTabela()
+    _motor["drevo"] = DrevoMCTS()
+    _motor["resevalca"] = {False: Resevalec(nalozi_bazo()), True: MizerniResevalec()}
+
+def isci_v_motorju(naloga):
+    """V procesu motorja poišče potezo. Iskanje prekine zastavica mesta, ki ga je naloga dobila v skupini.
+    Vrne (potezo, statistiko iskanja)."""
+    (mesto, stanje, metoda, cas) = naloga
+    igra = igra_iz_stanja(stanje)
+    algoritem = Algoritem(igra, _motor["tabela"], _motor["resevalca"][igra.mizerna], drevo=_motor["drevo"])
+    algoritem.prekinitev = _motor["prekinitve"][mesto]
+    domina = algoritem.isci(metoda, cas)
+    return (igra.poteza_domine(domina), algoritem.statistika(domina))
+
+class SkupinaMotorjev():
+    """Skupina toplih procesov motorjev. Vsako iskanje dobi eno od stevilo_procesov mest z lastno zastavico
+    za prekinitev, zato hkrati teče največ toliko iskanj, kolikor je procesov, in vsako lahko ustavimo posebej."""
+
+    def __init__(self, stevilo_procesov):
+        # Procese ustvarimo na novo (spawn), ker fork ob vlaknih strežnika ni varen.
+        kontekst = multiprocessing.get_context("spawn")
+        self.stevilo_procesov = stevilo_procesov
+        self.prekinitve = [kontekst.Event() for k in range(stevilo_procesov)]
+        self.prosta = queue.Queue() # Mesta, na katerih trenutno ne teče nobeno iskanje.
+        for mesto in range(stevilo_procesov):
+            self.prosta.put(mesto)
+        self.bazen = concurrent.futures.ProcessPoolExecutor(stevilo_procesov, mp_context=kontekst,
+                                                            initializer=zacni_motor, initargs=(self.prekinitve,))
+        # Procese zaženemo vnaprej, da zagon in nalaganje baze ne štejeta v čas prvih iskanj.
+        list(self.bazen.map(time.sleep, [0.1] * stevilo_procesov))
+        self.zaklep = threading.Lock()
+        self.iskanja = 0 # Število končanih iskanj.
+        self.vozlisca = 0
+        self.cas = 0.0 # Skupni čas iskanj v motorjih.
+
+    def isci(self, stanje, metoda, cas, koncano):
+        """Počaka na prosto mesto in v motorju začne iskanje. Ko je končano, pokliče koncano(poteza, statistika)
+        (ob napaki je poteza None, statistika pa opis napake) in šele nato sprosti mesto. Vrne mesto iskanja."""
+        mesto = self.prosta.get()
+        self.prekinitve[mesto].clear()
+        prihodnost = self.bazen.submit(isci_v_motorju, (mesto, stanje, metoda, cas))
+        def ob_koncu(prihodnost):
+            try:
+                (poteza, statistika) = prihodnost.result()
+            except Exception as napaka:
+                (poteza, statistika) = (None, repr(napaka))
+            else:
+                with self.zaklep:
+                    self.iskanja += 1
+                    self.vozlisca += statistika["vozlisca"]
+                    self.cas += statistika["cas"]
+            koncano(poteza, statistika)
+            self.prosta.put(mesto)
+        prihodnost.add_done_callback(ob_koncu)
+        return mesto
+
+    def ustavi(self, mesto):
+        """Ustavi iskanje na danem mestu. Motor vrne najboljšo potezo, ki jo je našel do tedaj."""
+        self.prekinitve[mesto].set()
+
+    def statistika(self):
+        with self.zaklep:
+            return {
+                "procesi": self.stevilo_procesov,
+                "zasedeni": self.stevilo_procesov - self.prosta.qsize(),
+                "iskanja": self.iskanja,
+                "vozlisca": self.vozlisca,
+                "vozlisca/s": self.vozlisca / self.cas if self.cas > 0 else 0.0
+            }
+
+    def zapri(self):
+        """Ustavi vsa iskanja in procese."""
+        for prekinitev in self.prekinitve:
+            prekinitev.set()
+        self.bazen.shutdown(wait=True, cancel_futures=True)
+
+def opis_poteze(poteza):
+    return "{0},{1},{2},{3}".format(*poteza)
+
+def preberi_potezo(opis):
+    """Iz opisa "x1,y1,x2,y2" vrne potezo."""
+    poteza = tuple(int(stevilo) for stevilo in opis.split(","))
+    if len(poteza) != 4:
+        raise ValueError("neveljavna poteza {0}".format(opis))
+    return poteza
+
+class Seja():
+    """Stanje ene povezave oz. standardnega vhoda: pozicija, tekoče iskanje in statistika zadnjega iskanja.
+    Odgovore piše s funkcijo pisi, ki jo lahko hkrati kličeta vlakno, ki bere ukaze, in konec iskanja."""
+
+    def __init__(self, motorji, pisi):
+        self.motorji = motorji
+        self.izpis = pisi
+        self.zaklep_izpisa = threading.Lock()
+        self.zaklep = threading.Lock() # Ščiti mesto tekočega iskanja.
+        self.igra = Igra(5)
+        self.mesto = None # Mesto tekočega iskanja v skupini motorjev ali None.
+        self.brez_iskanja = threading.Event() # Prižgana, ko ne teče nobeno iskanje.
+        self.brez_iskanja.set()
+        self.zadnje_iskanje = None # Statistika zadnjega končanega iskanja.
+        self.ukazi = {
+            "cram": self.cram,
+            "pripravljen": self.pripravljen,
+            "pozicija": self.pozicija,
+            "isci": self.isci,
+            "ustavi": self.ustavi,
+            "statistika": self.statistika,
+            "konec": self.konec
+        }
+
+    def pisi(self, vrstica):
+        with self.zaklep_izpisa:
+            self.izpis(vrstica)
+
+    def obdelaj(self, vrstica):
+        """Izvede ukaz iz vrstice. Vrne False, ko se seja konča."""
+        besede = vrstica.split()
+        if not besede:
+            return True
+        if besede[0] not in self.ukazi:
+            self.pisi("napaka neznan ukaz {0}".format(besede[0]))
+            return True
+        try:
+            return self.ukazi[besede[0]](besede[1:]) is not False
+        except ValueError as napaka:
+            self.pisi("napaka {0}".format(napaka))
+            return True
+
+    def cram(self, argumenti):
+        self.pisi("id ime Cram")
+        self.pisi("id metode {0}".format(" ".join(METODE)))
+        self.pisi("cramok")
+
+    def pripravljen(self, argumenti):
+        self.pisi("pripravljenok")
+
+    def pozicija(self, argumenti):
+        """Nastavi pozicijo: velikost plošče, pravila in poteze od začetka igre."""
+        if not self.brez_iskanja.is_set():
+            raise ValueError("iskanje še teče")
+        if not argumenti:
+            raise ValueError("manjka velikost plošče")
+        (vrstice, stolpci) = preberi_velikost(argumenti[0])
+        if not (2 <= vrstice <= 12 and 2 <= stolpci <= 12):
+            raise ValueError("neveljavna velikost {0}".format(argumenti[0]))
+        argumenti = argumenti[1:]
+        mizerna = bool(argumenti) and argumenti[0] == "mizerna"
+        if mizerna:
+            argumenti = argumenti[1:]
+        igra = Igra(vrstice, stolpci, mizerna)
+        if argumenti:
+            if argumenti[0] != "poteze":
+                raise ValueError("neznan argument {0}".format(argumenti[0]))
+            for opis in argumenti[1:]:
+                poteza = igra.normaliziraj_potezo(*preberi_potezo(opis))
+                if not igra.je_veljavna(*poteza):
+                    raise ValueError("neveljavna poteza {0}".format(opis))
+                igra.odigraj(igra.domina(*poteza))
+        self.igra = igra
+
+    def isci(self, argumenti):
+        """Začne iskanje v prostem motorju. Argumenti so pari "cas sekunde" in "metoda ime"."""
+        if len(argumenti) % 2:
+            raise ValueError("argumenti morajo biti pari ime vrednost")
+        nastavitve = dict(zip(argumenti[::2], argumenti[1::2]))
+        opis_casa = nastavitve.pop("cas", str(PRIVZETI_CAS))
+        try:
+            cas = float(opis_casa)
+        except ValueError:
+            cas = float("nan")
+        if not (math.isfinite(cas) and cas > 0): # Iskanje brez roka bi zasedlo motor do ukaza ustavi.
+            raise ValueError("neveljaven čas {0}".format(opis_casa))
+        metoda = nastavitve.pop("metoda", PRIVZETA_METODA)
+        if nastavitve:
+            raise ValueError("neznan argument {0}".format(next(iter(nastavitve))))
+        if metoda not in METODE:
+            raise ValueError("neznana metoda {0}".format(metoda))
+        if not self.brez_iskanja.is_set():
+            raise ValueError("iskanje že teče")
+        if not self.igra.stevilo_potez():
+            raise ValueError("igre je konec")
+        igra = self.igra
+        stanje = (igra.velikost, igra.rdeca, igra.modra, igra.na_potezi, igra.mizerna)
+        self.brez_iskanja.clear()
+        with self.zaklep: # Iskanje se ne more končati, preden si zapomnimo njegovo mesto.
+            self.mesto = self.motorji.isci(stanje, metoda, cas, self.koncano)
+
+    def koncano(self, poteza, statistika):
+        """Kliče se, ko se iskanje konča: izpiše statistiko in najboljšo potezo."""
+        with self.zaklep:
+            self.mesto = None
+            if poteza is not None:
+                self.zadnje_iskanje = statistika
+        with self.zaklep_izpisa:
+            # Sejo sprostimo, preden odjemalec dobi odgovor, da lahko takoj pošlje nov ukaz.
+            self.brez_iskanja.set()
+            if poteza is None:
+                self.izpis("napaka {0}".format(statistika))
+            else:
+                self.izpis("info globina {0} vrednost {1} vozlisca {2} cas {3:.3f}".format(
+                    statistika["globina"], statistika["vrednost"], statistika["vozlisca"], statistika["cas"]))
+                self.izpis("najboljsa {0}".format(opis_poteze(poteza)))
+
+    def ustavi(self, argumenti):
+        with self.zaklep:
+            if self.mesto is not None:
+                self.motorji.ustavi(self.mesto)
+
+    def statistika(self, argumenti):
+        self.pisi("statistika {0}".format(json.dumps({"iskanje": self.zadnje_iskanje, "motorji": self.motorji.statistika()})))
+
+    def konec(self, argumenti):
+        return False
+
+    def zakljuci(self):
+        """Ustavi tekoče iskanje in počaka, da se konča in izpiše odgovor."""
+        self.ustavi([])
+        self.brez_iskanja.wait()
+        with self.zaklep_izpisa:
+            pass
+
+def streznik_vhoda(motorji):
+    """Bere ukaze s standardnega vhoda in odgovarja na standardni izhod."""
+    def pisi(vrstica):
+        sys.stdout.write(vrstica + "\n")
+        sys.stdout.flush()
+    seja = Seja(motorji, pisi)
+    for vrstica in sys.stdin:
+        if not seja.obdelaj(vrstica):
+            break
+    seja.zakljuci()
+
+class ObdelovalecPovezave(socketserver.StreamRequestHandler):
+    """Vsaka povezava ima svojo sejo in teče v svojem vlaknu."""
+
+    disable_nagle_algorithm = True # Kratkih odgovorov ne zadržujemo, sicer zakasnitev naraste za desetine ms.
+
+    def handle(self):
+        seja = Seja(self.server.motorji, self.pisi)
+        for vrstica in self.rfile:
+            if not seja.obdelaj(vrstica.decode("utf-8", "replace")):
+                break
+        seja.zakljuci()
+
+    def pisi(self, vrstica):
+        try:
+            self.wfile.write((vrstica + "\n").encode("utf-8"))
+        except OSError:
+            pass # Odjemalec je zaprl povezavo.
+
+class StreznikTCP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, vrata, motorji):
+        super().__init__((NASLOV, vrata), ObdelovalecPovezave)
+        self.motorji = motorji
+
+def percentil(vrednosti, delez):
+    """Vrne percentil urejenega seznama vrednosti (delez med 0 in 1) oz. None, če je seznam prazen."""
+    if not vrednosti:
+        return None
+    return vrednosti[min(len(vrednosti) - 1, int(delez * len(vrednosti)))]
+
+def obremenitev(vrata, odjemalci, zahteve, velikost=(7, 7), cas=0.1, metoda=ALFABETA, seme=0):
+    """Vsak od odjemalci hkratnih odjemalcev odpre povezavo s strežnikom in zaporedoma pošlje zahteve
+    iskanj v naključnih pozicijah. Vrne slovar s številom uspešnih zahtev, napakami, prepustnostjo in
+    zakasnitvami uspešnih zahtev v sekundah (None, če ni bila uspešna nobena)."""
+    zakasnitve = []
+    napake = []
+    zaklep = threading.Lock()
+    def odjemalec(stevilka):
+        try:
+            poslji_zahteve(stevilka)
+        except OSError as napaka:
+            with zaklep:
+                napake.append("odjemalec {0}: {1}".format(stevilka, napaka))
+    def poslji_zahteve(stevilka):
+        generator = random.Random("{0}-{1}".format(seme, stevilka))
+        with socket.create_connection((NASLOV, vrata)) as vtic:
+            vtic.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            datoteka = vtic.makefile("rw", encoding="utf-8", newline="\n")
+            for k in range(zahteve):
+                igra = Igra(*velikost)
+                poteze = []
+                for j in range(generator.randrange(4)): # Nekaj naključnih potez, da pozicije niso vse enake.
+                    domina = generator.choice(igra.domine())
+                    poteze.append(opis_poteze(igra.poteza_domine(domina)))
+                    igra.odigraj(domina)
+                zacetek = time.perf_counter()
+                datoteka.write("pozicija {0}x{1} poteze {2}\n".format(*velikost, " ".join(poteze)))
+                datoteka.write("isci cas {0} metoda {1}\n".format(cas, metoda))
+                datoteka.flush()
+                vrstica = "povezava prekinjena"
+                for vrstica in datoteka:
+                    if vrstica.startswith(("najboljsa", "napaka")):
+                        break
+                with zaklep:
+                    if vrstica.startswith("najboljsa"):
+                        zakasnitve.append(time.perf_counter() - zacetek)
+                    else:
+                        napake.append(vrstica.strip())
+            datoteka.write("konec\n")
+            datoteka.flush()
+    zacetek = time.perf_counter()
+    vlakna = [threading.Thread(target=odjemalec, args=(stevilka,)) for stevilka in range(odjemalci)]
+    for vlakno in vlakna:
+        vlakno.start()
+    for vlakno in vlakna:
+        vlakno.join()
+    trajanje = time.perf_counter() - zacetek
+    zakasnitve.sort()
+    return {
+        "zahteve": len(zakasnitve),
+        "napake": napake,
+        "prepustnost": len(zakasnitve) / trajanje,
+        "p50": percentil(zakasnitve, 0.5),
+        "p99": percentil(zakasnitve, 0.99)
+    }
+
+def opis_zakasnitve(zakasnitev):
+    return "{0:.1f} ms".format(1000 * zakasnitev) if zakasnitev is not None else "-"
+
+def izpisi_obremenitev(rezultat, cas):
+    print("Zahtev: {0} (napak {1}), prepustnost {2:.2f} zahtev/s".format(rezultat["zahteve"], len(rezultat["napake"]), rezultat["prepustnost"]))
+    print("Zakasnitev: p50 {0}, p99 {1} (čas iskanja {2:.0f} ms)".format(
+        opis_zakasnitve(rezultat["p50"]), opis_zakasnitve(rezultat["p99"]), 1000 * cas))
+    for napaka in rezultat["napake"][:10]:
+        print(napaka)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strežnik pogona Cram z vrstičnim protokolom.")
+    parser.add_argument("--vrata", type=int, help="vrata TCP na 127.0.0.1; brez njih strežnik bere ukaze s standardnega vhoda")
+    parser.add_argument("--procesi", type=int, default=os.cpu_count(), help="število procesov motorjev")
+    parser.add_argument("--obremenitev", action="store_true",
+                        help="namesto strežnika požene odjemalce, ki obremenijo strežnik na --vrata (brez --vrat zažene lokalnega)")
+    parser.add_argument("--odjemalci", type=int, default=4, help="število hkratnih odjemalcev za --obremenitev")
+    parser.add_argument("--zahteve", type=int, default=20, help="število zahtev vsakega odjemalca za --obremenitev")
+    parser.add_argument("--velikost", type=preberi_velikost, default=(7, 7), help="velikost plošče za --obremenitev, npr. 7 ali 6x8")
+    parser.add_argument("--cas", type=float, default=0.1, help="čas iskanja v sekundah za --obremenitev")
+    parser.add_argument("--metoda", default=ALFABETA, choices=METODE, help="metoda iskanja za --obremenitev")
+    argumenti = parser.parse_args()
+    if argumenti.obremenitev:
+        streznik = None
+        vrata = argumenti.vrata
+        if vrata is None:
+            streznik = StreznikTCP(0, SkupinaMotorjev(argumenti.procesi))
+            vrata = streznik.server_address[1]
+            threading.Thread(target=streznik.serve_forever, daemon=True).start()
+        rezultat = obremenitev(vrata, argumenti.odjemalci, argumenti.zahteve, argumenti.velikost, argumenti.cas, argumenti.metoda)
+        izpisi_obremenitev(rezultat, argumenti.cas)
+        if streznik is not None:
+            streznik.shutdown()
+            streznik.motorji.zapri()
+    else:
+        motorji = SkupinaMotorjev(argumenti.procesi)
+        try:
+            if argumenti.vrata is None:
+                streznik_vhoda(motorji)
+            else:
+                with StreznikTCP(argumenti.vrata, motorji) as streznik:
+                    streznik.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            motorji.zapri()
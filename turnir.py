@@ -0,0 +1,144 @@
+"""Turnir med računalniškimi igralci. Igre tečejo hkrati v skupini procesov, na koncu se izpišejo
+deleži zmag, povprečni čas za potezo in število preiskanih vozlišč na sekundo za vsakega igralca.
+
+Z --zapisi se vse igre dodajo v datoteko z zapisi iger, ki jih lahko analiziramo z analiza.py.
+
+Primer: python turnir.py alfabeta:0.1 minimax:0.1 --velikosti 5 6x8 --igre 100 --procesi 4"""
+
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+
+from motor import (Igra, Algoritem, TranspozicijskaTabela, DrevoMCTS, Resevalec, MizerniResevalec, PisecIger, nalozi_bazo, MINIMAX,
+                   ALFABETA, NIMBERJI, MCTS, RDECI, MODRI, preberi_velikost)
+
+METODE = (MINIMAX, ALFABETA, NIMBERJI, MCTS)
+
+def preberi_igralca(opis):
+    """Iz opisa "metoda:cas" (npr. "alfabeta:0.5") vrne par (metoda, cas v sekundah)."""
+    (metoda, _, cas) = opis.partition(":")
+    if metoda not in METODE:
+        raise argparse.ArgumentTypeError("neznana metoda {0}, možne so {1}".format(metoda, ", ".join(METODE)))
+    try:
+        return (metoda, float(cas or 1.0))
+    except ValueError:
+        raise argparse.ArgumentTypeError("neveljaven čas {0}".format(cas))
+
+# Rešitelja procesa (za normalno in mizerno igro), ki ju uporabljajo vse igre v tem procesu, da se baza
+# naloži le enkrat in mizerni rešitelj ohrani znane pozicije.
+_resevalca = {}
+
+def odigraj_igro(naloga):
+    """Odigra eno igro in vrne slovar z izidom ter časom, številom potez in vozlišč za oba igralca ter
+    položenimi dominami. Prvih nekaj potez je naključnih, da igre med istima igralcema niso vse enake."""
+    (velikost, igralca, odprtje, seme, mizerna) = naloga
+    if mizerna not in _resevalca:
+        _resevalca[mizerna] = MizerniResevalec() if mizerna else Resevalec(nalozi_bazo())
+    igra = Igra(*velikost, mizerna=mizerna)
+    generator = random.Random(seme)
+    odigrane = []
+    for k in range(odprtje):
+        domine = igra.domine()
+        if not domine:
+            break
+        odigrane.append(generator.choice(domine))
+        igra.odigraj(odigrane[-1])
+    tabeli = {RDECI: TranspozicijskaTabela(), MODRI: TranspozicijskaTabela()}
+    drevesi = {RDECI: DrevoMCTS(seme), MODRI: DrevoMCTS(seme)}
+    casi = {RDECI: 0.0, MODRI: 0.0}
+    poteze = {RDECI: 0, MODRI: 0}
+    vozlisca = {RDECI: 0, MODRI: 0}
+    while igra.domine():
+        barva = igra.na_potezi
+        (metoda, cas) = igralca[0] if barva == RDECI else igralca[1]
+        algoritem = Algoritem(igra.kopija_igre(), tabeli[barva], _resevalca[mizerna], drevo=drevesi[barva])
+        zacetek = time.perf_counter()
+        domina = algoritem.isci(metoda, cas)
+        casi[barva] += time.perf_counter() - zacetek
+        poteze[barva] += 1
+        vozlisca[barva] += algoritem.vozlisca
+        odigrane.append(domina)
+        igra.odigraj(domina)
+    # Igralec na potezi ne more položiti domine, zato je v normalni igri izgubil, v mizerni pa zmagal.
+    zmagal_rdeci = (igra.na_potezi != RDECI) != mizerna
+    return {
+        "velikost": velikost,
+        "zmagal_rdeci": zmagal_rdeci,
+        "casi": (casi[RDECI], casi[MODRI]),
+        "poteze": (poteze[RDECI], poteze[MODRI]),
+        "vozlisca": (vozlisca[RDECI], vozlisca[MODRI]),
+        "domine": odigrane
+    }
+
+def naloge_turnirja(igralci, velikosti, igre, odprtje, mizerna=False):
+    """Našteje igre turnirja: vsak par igralcev na vsaki velikosti odigra igre z obema barvama in
+    z istimi odprtji. Vsaka naloga je (rdeči, modri, naloga za odigraj_igro)."""
+    for velikost in velikosti:
+        for i in range(len(igralci)):
+            for j in range(len(igralci)):
+                if i == j:
+                    continue
+                for igra in range(igre):
+                    seme = "{0}x{1}-{2}-{3}-{4}".format(*velikost, min(i, j), max(i, j), igra)
+                    yield (i, j, (velikost, (igralci[i], igralci[j]), odprtje, seme, mizerna))
+
+def turnir(igralci, velikosti, igre, odprtje=2, procesi=None, mizerna=False, zapisi=None):
+    """Odigra turnir in vrne statistiko za vsakega igralca in vsako velikost. Če je podana datoteka
+    zapisi, vanjo doda vse odigrane igre."""
+    statistika = [{"igre": 0, "zmage": 0, "cas": 0.0, "poteze": 0, "vozlisca": 0, "velikosti": {}} for igralec in igralci]
+    naloge = list(naloge_turnirja(igralci, velikosti, igre, odprtje, mizerna))
+    zacetek = time.perf_counter()
+    pisec = PisecIger(zapisi) if zapisi is not None else None
+    with concurrent.futures.ProcessPoolExecutor(procesi) as bazen:
+        odigrane = {bazen.submit(odigraj_igro, naloga): (rdeci, modri) for (rdeci, modri, naloga) in naloge}
+        for (stevec, odigrana) in enumerate(concurrent.futures.as_completed(odigrane), 1):
+            izid = odigrana.result()
+            if pisec is not None:
+                pisec.zapisi(izid["velikost"], mizerna, izid["domine"])
+            for (barva, igralec) in enumerate(odigrane[odigrana]):
+                zmaga = izid["zmagal_rdeci"] == (barva == 0)
+                podatki = statistika[igralec]
+                podatki["igre"] += 1
+                podatki["zmage"] += zmaga
+                podatki["cas"] += izid["casi"][barva]
+                podatki["poteze"] += izid["poteze"][barva]
+                podatki["vozlisca"] += izid["vozlisca"][barva]
+                (igre_velikosti, zmage_velikosti) = podatki["velikosti"].get(izid["velikost"], (0, 0))
+                podatki["velikosti"][izid["velikost"]] = (igre_velikosti + 1, zmage_velikosti + zmaga)
+            if stevec % max(1, len(naloge) // 10) == 0:
+                print("Odigranih {0}/{1} iger ({2:.0f} s).".format(stevec, len(naloge), time.perf_counter() - zacetek))
+    if pisec is not None:
+        pisec.zapri()
+    return statistika
+
+def izpisi_statistiko(igralci, velikosti, statistika):
+    """Izpiše tabelo z rezultati turnirja."""
+    stolpci = ["{0}x{1}".format(*velikost) for velikost in velikosti]
+    print("{0:<18} {1:>6} {2:>7} {3:>13} {4:>12}".format("igralec", "igre", "zmage", "čas/poteza[ms]", "vozlišča/s")
+          + "".join("{0:>8}".format(stolpec) for stolpec in stolpci))
+    for ((metoda, cas), podatki) in zip(igralci, statistika):
+        delez = podatki["zmage"] / max(1, podatki["igre"])
+        cas_poteze = 1000 * podatki["cas"] / max(1, podatki["poteze"])
+        hitrost = podatki["vozlisca"] / max(1e-9, podatki["cas"])
+        vrstica = "{0:<18} {1:>6} {2:>7.1%} {3:>13.1f} {4:>12.0f}".format("{0}:{1}".format(metoda, cas), podatki["igre"], delez, cas_poteze, hitrost)
+        for velikost in velikosti:
+            (igre_velikosti, zmage_velikosti) = podatki["velikosti"].get(velikost, (0, 0))
+            vrstica += "{0:>8.1%}".format(zmage_velikosti / max(1, igre_velikosti))
+        print(vrstica)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turnir med računalniškimi igralci igre Cram.")
+    parser.add_argument("igralci", nargs="+", type=preberi_igralca, help="igralci v obliki metoda:čas, npr. alfabeta:0.5")
+    parser.add_argument("--velikosti", nargs="+", type=preberi_velikost, default=[(5, 5)], help="velikosti plošč, npr. 5 ali 6x8")
+    parser.add_argument("--igre", type=int, default=10, help="število iger za vsak par igralcev, barvo in velikost")
+    parser.add_argument("--odprtje", type=int, default=2, help="število naključnih potez na začetku vsake igre")
+    parser.add_argument("--procesi", type=int, default=os.cpu_count(), help="število procesov")
+    parser.add_argument("--mizerna", action="store_true", help="igre so mizerne: kdor položi zadnjo domino, izgubi")
+    parser.add_argument("--zapisi", help="datoteka, v katero dodamo zapise odigranih iger")
+    argumenti = parser.parse_args()
+    if len(argumenti.igralci) < 2:
+        parser.error("potrebna sta vsaj dva igralca")
+    statistika = turnir(argumenti.igralci, argumenti.velikosti, argumenti.igre, argumenti.odprtje, argumenti.procesi, argumenti.mizerna, argumenti.zapisi)
+    izpisi_statistiko(argumenti.igralci, argumenti.velikosti, statistika)